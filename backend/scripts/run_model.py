@@ -1,17 +1,110 @@
 #!/usr/bin/env python3
-"""Run llama-server with a HuggingFace model."""
+"""Run a local OpenAI-compatible model server with a HuggingFace model.
 
-import subprocess
+Supports two backends:
+- llama: llama-server (llama.cpp), works on CPU-only machines with GGUF models
+- vllm: vLLM, continuous batching + PagedAttention for concurrent agent workloads
+"""
+
+import argparse
+import os
 import sys
 
 
+def build_llama_cmd(
+    hf_repo: str,
+    hf_file: str | None,
+    parallel: int = 4,
+    ctx_per_slot: int = 8192,
+) -> list[str]:
+    """Build the llama-server command line.
+
+    The context is split evenly across ``parallel`` slots, so each concurrent
+    request (e.g. team members running at once) gets ``ctx_per_slot`` tokens.
+    """
+    cmd = [
+        "llama-server",
+        "--hf-repo", hf_repo,
+        "--port", "8080",
+        "--host", "127.0.0.1",
+        "--ctx-size", str(parallel * ctx_per_slot),
+        "-np", str(parallel),
+        "--cont-batching",  # Batch decode steps of concurrent slots together
+        "--metrics",
+        "--mlock",
+        "--cache-reuse", "256",  # Reuse KV cache for shared prompt prefixes across turns
+        "-ub", "2048",
+        "-b", "2048",
+        "--jinja",  # Required for tool/function calling support
+    ]
+
+    if hf_file:
+        cmd.extend(["--hf-file", hf_file])
+
+    return cmd
+
+
+def build_vllm_cmd(hf_repo: str, tool_call_parser: str | None = None) -> list[str]:
+    """Build the vLLM OpenAI-compatible server command line.
+
+    A ``:quant`` suffix on the repo (e.g. ``org/model:awq``) selects the
+    quantization method; otherwise vLLM uses the checkpoint's own config.
+    Tool calling needs the parser matching the model's chat template
+    (e.g. ``hermes``, ``mistral``, ``llama3_json``), so it is only enabled
+    when ``tool_call_parser`` is given.
+    """
+    repo, _, quant = hf_repo.partition(":")
+    cmd = [
+        "vllm", "serve", repo,
+        "--port", "8080",
+        "--host", "127.0.0.1",
+        "--max-num-seqs", "32",
+        "--enable-prefix-caching",
+        "--kv-cache-dtype", "fp8",
+    ]
+
+    if quant:
+        cmd.extend(["--quantization", quant])
+    if tool_call_parser:
+        cmd.extend(["--enable-auto-tool-choice", "--tool-call-parser", tool_call_parser])
+
+    return cmd
+
+
 def main() -> None:
-    if len(sys.argv) < 2:
-        print("Usage: python run_model.py <user>/<model-repo>/<filename.gguf>")
-        print("Example: python run_model.py unsloth/DeepSeek-R1-Distill-Qwen-7B-GGUF/DeepSeek-R1-Distill-Qwen-7B-Q4_K_M.gguf")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        description="Run a local model server with a HuggingFace model.",
+        epilog="Example: python run_model.py unsloth/DeepSeek-R1-Distill-Qwen-7B-GGUF/DeepSeek-R1-Distill-Qwen-7B-Q4_K_M.gguf",
+    )
+    parser.add_argument(
+        "model_path",
+        help="<user>/<model-repo>/<filename.gguf> or <user>/<model>[:quant]",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["llama", "vllm"],
+        default="llama",
+        help="Server backend (default: llama). Use vllm for GPU continuous batching.",
+    )
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=4,
+        help="llama-server parallel decoding slots (default: 4)",
+    )
+    parser.add_argument(
+        "--ctx-per-slot",
+        type=int,
+        default=8192,
+        help="llama-server context tokens per slot (default: 8192)",
+    )
+    parser.add_argument(
+        "--tool-call-parser",
+        help="vLLM tool call parser for the model (e.g. hermes, mistral); enables tool calling",
+    )
+    args = parser.parse_args()
 
-    model_path = sys.argv[1]
+    model_path = args.model_path
 
     # Parse the path: user/repo/filename.gguf
     parts = model_path.split("/")
@@ -27,22 +120,17 @@ def main() -> None:
         print("Expected: <user>/<model-repo>/<filename.gguf> or <user>/<model>[:quant]")
         sys.exit(1)
 
-    cmd = [
-        "llama-server",
-        "--hf-repo", hf_repo,
-        "--port", "8080",
-        "--host", "127.0.0.1",
-        "--ctx-size", "0",
-        "-ub", "2048",
-        "-b", "2048",
-        "--jinja",  # Required for tool/function calling support
-    ]
-
-    if hf_file:
-        cmd.extend(["--hf-file", hf_file])
+    if args.backend == "vllm":
+        if hf_file:
+            print("vLLM serves HuggingFace repos directly; use <user>/<model>[:quant]")
+            sys.exit(1)
+        cmd = build_vllm_cmd(hf_repo, args.tool_call_parser)
+    else:
+        cmd = build_llama_cmd(hf_repo, hf_file, args.parallel, args.ctx_per_slot)
 
-    print(f"Running: {' '.join(cmd)}")
-    subprocess.run(cmd, check=True)
+    print(f"Running: {' '.join(cmd)}", flush=True)
+    # Replace this process so the server receives signals directly
+    os.execvp(cmd[0], cmd)
 
 
 if __name__ == "__main__":
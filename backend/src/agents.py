@@ -5,30 +5,152 @@ run_python_code, uv_add, and save_and_run_python_file directly. Nested tools
 (web_search, fetch_url, etc.) are only accessible within the Python interpreter.
 """
 
-import json
+import asyncio
+import functools
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Callable
+from typing import Any, Callable
 
+import orjson
 from agno.agent.agent import Agent
 from agno.db.sqlite import SqliteDb
 from agno.models.openrouter import OpenRouter
 from agno.team import Team
 from agno.tools.mcp import MCPTools
+from agno.utils.string import generate_id
 from agno.workflow import Workflow
+from loguru import logger
+from sqlalchemy import Connection, Engine, Table, create_engine, event
+
+from paths import CONFIG_DIR, DATA_DIR
+
+# Applied to every pooled SQLite connection. WAL lets session reads proceed
+# while another agent is writing; busy_timeout makes writers wait for the
+# lock instead of failing with "database is locked".
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-64000",
+)
+
+
+def create_sqlite_engine(db_file: Path, pool_size: int = 8) -> Engine:
+    """Create a pooled SQLite engine tuned for concurrent agent/team runs."""
+    engine = create_engine(
+        f"sqlite:///{db_file}",
+        pool_size=pool_size,
+        connect_args={"check_same_thread": False},
+    )
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, _connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+
+    return engine
+
+
+# Composite indexes for the sidebar's session listing, which filters by one
+# agent/team and orders by created_at. Agno only indexes created_at on its own,
+# so without these SQLite scans and sorts every session of every entity.
+SESSION_LIST_INDEXES = (
+    ("agent_created", "agent_id, created_at"),
+    ("team_created", "team_id, created_at"),
+)
+
+
+def _create_session_indexes(conn: Connection, table: str) -> None:
+    """Create SESSION_LIST_INDEXES on the given sessions table."""
+    for suffix, columns in SESSION_LIST_INDEXES:
+        conn.exec_driver_sql(
+            f"CREATE INDEX IF NOT EXISTS idx_{table}_{suffix} ON {table} ({columns})"
+        )
+
+
+def ensure_session_indexes(db: SqliteDb) -> None:
+    """Add SESSION_LIST_INDEXES to the sessions table, now or once agno creates it."""
+    table = db.session_table_name
+    if db.table_exists(table):
+        with db.db_engine.begin() as conn:
+            _create_session_indexes(conn, table)
+        return
+
+    # Agno creates its tables on first use - index this one as soon as it does
+    def on_create(target: Table, connection: Connection, **kw: Any) -> None:
+        if target.name == table:
+            _create_session_indexes(connection, table)
+
+    event.listen(Table, "after_create", on_create)
+
+
+# The id agno gave the db when it was opened with db_file alone - its seed
+# falls back to "sqlite:///agno.db" whenever no engine is passed. Pinned so
+# the shared engine doesn't change the id that AgentOS clients refer to.
+AGNO_DB_ID = generate_id("sqlite:///agno.db")
+
+
+@functools.lru_cache(maxsize=1)
+def get_db() -> SqliteDb:
+    """Shared database for all agents - auto-creates tables for sessions and memory.
+
+    Opened on first use so importing this module has no filesystem side effects.
+    """
+    DATA_DIR.mkdir(exist_ok=True)
+    db = SqliteDb(
+        db_engine=create_sqlite_engine(DATA_DIR / "agent_composer.db"),
+        id=AGNO_DB_ID,
+    )
+    ensure_session_indexes(db)
+    return db
+
 
-# Paths
-DATA_DIR = Path(__file__).parent.parent / "data"
-CONFIG_DIR = Path(__file__).parent.parent / "config"
-DATA_DIR.mkdir(exist_ok=True)
+# Default model for team members and workflow steps
+DEFAULT_MODEL_ID = "mistralai/devstral-2512:free"
 
-# Shared database for all agents - auto-creates tables for sessions and memory
-db = SqliteDb(db_file=str(DATA_DIR / "agent_composer.db"))
 
+@functools.lru_cache(maxsize=32)
+def make_model(model_id: str = DEFAULT_MODEL_ID) -> OpenRouter:
+    """Return an OpenRouter model that routes to the highest-throughput provider.
+
+    Instances are shared per model ID so agents reuse one HTTP client and its
+    connection pool instead of each opening their own.
+    """
+    return OpenRouter(id=model_id, extra_body={"provider": {"sort": "throughput"}})
+
+
+def _build_mcp_tool(server: dict) -> MCPTools | None:
+    """Create MCPTools for one server config entry, or None on failure."""
+    # Build command string if args provided
+    command = server.get("command")
+    if command and server.get("args"):
+        command = f"{command} {' '.join(server['args'])}"
+
+    try:
+        tool = MCPTools(
+            command=command,
+            url=server.get("url"),
+            transport=server.get("transport", "stdio"),
+            env=server.get("env"),
+            tool_name_prefix=server.get("prefix"),
+        )
+        logger.info("Loaded MCP server: {}", server.get("name", command or server.get("url")))
+        return tool
+    except Exception as e:
+        logger.warning("Failed to load MCP server {}: {}", server, e)
+        return None
 
+
+@functools.lru_cache(maxsize=1)
 def load_mcp_tools() -> list[MCPTools]:
     """Load MCP tools from config/mcp_servers.json.
 
+    Loaded lazily on first use and cached; call reload_mcp_tools() after
+    changing the config.
+
     Config format:
     {
         "servers": [
@@ -38,47 +160,33 @@ def load_mcp_tools() -> list[MCPTools]:
     }
     """
     config_file = CONFIG_DIR / "mcp_servers.json"
-    if not config_file.exists():
+    try:
+        raw = config_file.read_bytes()
+    except FileNotFoundError:
         return []
 
     try:
-        config = json.loads(config_file.read_text())
+        config = orjson.loads(raw)
         servers = config.get("servers", [])
 
         mcp_tools = []
         for server in servers:
-            if not server.get("enabled", True):
-                continue
-
-            # Build command string if args provided
-            command = server.get("command")
-            if command and server.get("args"):
-                command = f"{command} {' '.join(server['args'])}"
-
-            try:
-                tool = MCPTools(
-                    command=command,
-                    url=server.get("url"),
-                    transport=server.get("transport", "stdio"),
-                    env=server.get("env"),
-                    tool_name_prefix=server.get("prefix"),
-                )
+            if server.get("enabled", True) and (tool := _build_mcp_tool(server)):
                 mcp_tools.append(tool)
-                print(f"Loaded MCP server: {server.get('name', command or server.get('url'))}")
-            except Exception as e:
-                print(f"Failed to load MCP server {server}: {e}")
 
         return mcp_tools
     except Exception as e:
-        print(f"Failed to load MCP config: {e}")
+        logger.warning("Failed to load MCP config: {}", e)
         return []
 
 
-# Load MCP tools at module initialization
-MCP_TOOLS = load_mcp_tools()
+def reload_mcp_tools() -> list[MCPTools]:
+    """Drop the cached MCP tools and load them again from config."""
+    load_mcp_tools.cache_clear()
+    return load_mcp_tools()
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentConfig:
     """Configuration for an agent."""
 
@@ -144,15 +252,30 @@ Format code blocks with syntax highlighting.""",
 }
 
 
+# Custom agents keyed by agents.json (mtime_ns, size, inode) - reloaded only when the file changes
+_custom_agents_cache: tuple[tuple[int, int, int], dict[str, AgentConfig]] | None = None
+
+
 def load_custom_agents() -> dict[str, AgentConfig]:
-    """Load custom agent configurations from JSON file."""
+    """Load custom agent configurations from JSON file.
+
+    The parsed configs are cached until the file changes on disk, so repeated
+    calls from request handlers don't re-read and re-parse the file.
+    """
+    global _custom_agents_cache
     agents_file = CONFIG_DIR / "agents.json"
-    if not agents_file.exists():
+    try:
+        st = agents_file.stat()
+    except FileNotFoundError:
         return {}
 
+    key = (st.st_mtime_ns, st.st_size, st.st_ino)
+    if _custom_agents_cache is not None and _custom_agents_cache[0] == key:
+        return _custom_agents_cache[1]
+
     try:
-        data = json.loads(agents_file.read_text())
-        return {
+        data = orjson.loads(agents_file.read_bytes())
+        custom = {
             agent["id"]: AgentConfig(
                 id=agent["id"],
                 name=agent["name"],
@@ -162,9 +285,12 @@ def load_custom_agents() -> dict[str, AgentConfig]:
             )
             for agent in data
         }
-    except (json.JSONDecodeError, KeyError, OSError) as e:
-        print(f"Failed to load custom agents: {e}")
-        return {}
+    except (orjson.JSONDecodeError, KeyError, OSError) as e:
+        logger.warning("Failed to load custom agents: {}", e)
+        custom = {}
+
+    _custom_agents_cache = (key, custom)
+    return custom
 
 
 def get_all_agent_configs() -> dict[str, AgentConfig]:
@@ -183,19 +309,51 @@ def reload_agent_configs() -> None:
     AGENT_CONFIGS = get_all_agent_configs()
 
 
+# Agent list projection, rebuilt only when the custom agents change
+_agent_list_cache: tuple[dict[str, AgentConfig], list[dict]] | None = None
+
+
 def get_agent_list() -> list[dict]:
     """Return list of available agents for the frontend dropdown."""
-    # Use fresh configs to pick up any changes
-    all_configs = get_all_agent_configs()
-    return [
+    global _agent_list_cache
+    custom = load_custom_agents()
+    if _agent_list_cache is not None and _agent_list_cache[0] is custom:
+        return _agent_list_cache[1]
+
+    agent_list = [
         {
             "id": config.id,
             "name": config.name,
             "description": config.description,
             "builtin": config.id in BUILTIN_AGENT_CONFIGS,
         }
-        for config in all_configs.values()
+        for config in {**BUILTIN_AGENT_CONFIGS, **custom}.values()
     ]
+    _agent_list_cache = (custom, agent_list)
+    return agent_list
+
+
+@functools.lru_cache(maxsize=64)
+def build_agent_instructions(instructions: str, tool_docs: str) -> str:
+    """Combine an agent's instructions with the nested tool documentation.
+
+    Cached on the instruction text itself, so edited custom agents get a
+    fresh prompt while unchanged ones reuse the same string.
+    """
+    return f"""{instructions}
+
+{tool_docs}
+
+IMPORTANT: You do NOT have web_search, fetch_url, shell, or other tools as direct function calls.
+To use these capabilities, you MUST write Python code and use run_python_code.
+
+### Example - To search the web:
+```python
+results = web_search("Python tutorials", num_results=3)
+print(results)
+```
+
+NEVER call tools directly. ALWAYS wrap them in run_python_code."""
 
 
 def create_agent(
@@ -224,32 +382,20 @@ def create_agent(
     config = all_configs[agent_id]
 
     # Build full instructions with tool documentation
-    full_instructions = f"""{config.instructions}
-
-{tool_docs}
-
-IMPORTANT: You do NOT have web_search, fetch_url, shell, or other tools as direct function calls.
-To use these capabilities, you MUST write Python code and use run_python_code.
-
-### Example - To search the web:
-```python
-results = web_search("Python tutorials", num_results=3)
-print(results)
-```
-
-NEVER call tools directly. ALWAYS wrap them in run_python_code."""
+    full_instructions = build_agent_instructions(config.instructions, tool_docs)
 
     # Combine explicit tools with MCP tools
-    all_tools = list(tools) + MCP_TOOLS
+    all_tools = list(tools) + load_mcp_tools()
 
     return Agent(
-        model=OpenRouter(id=config.model_id),
+        model=make_model(config.model_id),
         tools=all_tools,
         description=config.description,
         instructions=full_instructions,
         debug_mode=debug_mode,
+        stream=True,  # Default to token streaming so callers see the first token early
         # Enable Agno persistence - sessions are stored in SQLite
-        db=db,
+        db=get_db(),
         add_history_to_context=True,  # Load previous messages from session
         num_history_runs=5,  # Include last 5 conversation turns in context
     )
@@ -273,18 +419,35 @@ BUILTIN_TEAM_CONFIGS = {
 }
 
 
+# Custom teams keyed by teams.json (mtime_ns, size, inode) - reloaded only when the file changes
+_custom_teams_cache: tuple[tuple[int, int, int], dict[str, dict]] | None = None
+
+
 def load_custom_teams() -> dict[str, dict]:
-    """Load custom team configurations from JSON file."""
+    """Load custom team configurations from JSON file.
+
+    The parsed configs are cached until the file changes on disk.
+    """
+    global _custom_teams_cache
     teams_file = CONFIG_DIR / "teams.json"
-    if not teams_file.exists():
+    try:
+        st = teams_file.stat()
+    except FileNotFoundError:
         return {}
 
+    key = (st.st_mtime_ns, st.st_size, st.st_ino)
+    if _custom_teams_cache is not None and _custom_teams_cache[0] == key:
+        return _custom_teams_cache[1]
+
     try:
-        data = json.loads(teams_file.read_text())
-        return {team["id"]: team for team in data}
-    except (json.JSONDecodeError, KeyError, OSError) as e:
-        print(f"Failed to load custom teams: {e}")
-        return {}
+        data = orjson.loads(teams_file.read_bytes())
+        custom = {team["id"]: team for team in data}
+    except (orjson.JSONDecodeError, KeyError, OSError) as e:
+        logger.warning("Failed to load custom teams: {}", e)
+        custom = {}
+
+    _custom_teams_cache = (key, custom)
+    return custom
 
 
 def get_all_team_configs() -> dict[str, dict]:
@@ -297,32 +460,9 @@ def get_all_team_configs() -> dict[str, dict]:
 TEAM_CONFIGS = get_all_team_configs()
 
 
-def create_team(
-    team_id: str,
-    tools: list[Callable],
-    tool_docs: str,
-) -> Team:
-    """Create a team instance with the given configuration.
-
-    Args:
-        team_id: The team ID (research, or custom)
-        tools: List of tool functions (run_python_code, etc.)
-        tool_docs: Generated documentation for nested Python tools
-
-    Returns:
-        Configured Team instance
-    """
-    # Use fresh configs to pick up custom teams
-    all_configs = get_all_team_configs()
-
-    if team_id not in all_configs:
-        raise ValueError(f"Unknown team: {team_id}. Available: {list(all_configs.keys())}")
-
-    config = all_configs[team_id]
-
-    # Build member agents with role-specific instructions
-    ROLE_INSTRUCTIONS = {
-        "Researcher": """You are the Researcher on a research team.
+# Role-specific instructions for well-known team members
+ROLE_INSTRUCTIONS: dict[str, str] = {
+    "Researcher": """You are the Researcher on a research team.
 Your role: Find and gather relevant information using web search.
 
 CRITICAL: You MUST use run_python_code with web_search() for EVERY research task.
@@ -342,49 +482,81 @@ print(content)
 
 Always search first, then report the ACTUAL results you found. Include source URLs.""",
 
-        "Analyst": """You are the Analyst on a research team.
+    "Analyst": """You are the Analyst on a research team.
 Your role: Analyze and synthesize the research findings provided to you.
 Identify key patterns, verify consistency across sources, and highlight important insights.
 Be critical - note if information seems incomplete or contradictory.""",
 
-        "Writer": """You are the Writer on a research team.
+    "Writer": """You are the Writer on a research team.
 Your role: Create clear, well-structured content based on the analysis.
 Use markdown formatting. Cite sources when available.
 Only include information that was actually found - never add made-up details.""",
-    }
+}
 
-    members = []
-    for member_config in config["members"]:
-        member_tools = tools if member_config.get("has_tools") else []
 
-        # Use role-specific instructions or fall back to generic
-        base_instructions = ROLE_INSTRUCTIONS.get(
-            member_config["name"],
-            f"You are the {member_config['name']}. Your role: {member_config['role']}"
-        )
+@functools.lru_cache(maxsize=128)
+def build_member_instructions(name: str, role: str, tool_docs: str | None) -> str:
+    """Return a team member's instructions, with tool docs appended if given.
+
+    Uses the role-specific instructions when the member name is known and
+    falls back to a generic prompt otherwise.
+    """
+    base_instructions = ROLE_INSTRUCTIONS.get(name) or f"You are the {name}. Your role: {role}"
+    if tool_docs is None:
+        return base_instructions
+    return f"{base_instructions}\n\n{tool_docs}"
+
+
+def create_team(
+    team_id: str,
+    tools: list[Callable],
+    tool_docs: str,
+) -> Team:
+    """Create a team instance with the given configuration.
+
+    Args:
+        team_id: The team ID (research, or custom)
+        tools: List of tool functions (run_python_code, etc.)
+        tool_docs: Generated documentation for nested Python tools
 
-        # Add tool docs for members with tools
-        member_instructions = base_instructions
-        if member_config.get("has_tools"):
-            member_instructions += f"\n\n{tool_docs}"
-
-        members.append(Agent(
-            name=member_config["name"],
-            role=member_config["role"],
-            model=OpenRouter(id="mistralai/devstral-2512:free"),
-            tools=member_tools,
-            instructions=member_instructions,
+    Returns:
+        Configured Team instance
+    """
+    # Use fresh configs to pick up custom teams
+    all_configs = get_all_team_configs()
+
+    if team_id not in all_configs:
+        raise ValueError(f"Unknown team: {team_id}. Available: {list(all_configs.keys())}")
+
+    config = all_configs[team_id]
+
+    def build_member(member_config: dict) -> Agent:
+        name = member_config["name"]
+        role = member_config["role"]
+        has_tools = bool(member_config.get("has_tools"))
+
+        return Agent(
+            name=name,
+            role=role,
+            model=make_model(),
+            tools=tools if has_tools else [],
+            instructions=build_member_instructions(name, role, tool_docs if has_tools else None),
             debug_mode=True,
-        ))
+            stream=True,
+        )
+
+    members = [build_member(member_config) for member_config in config["members"]]
 
     return Team(
         name=config["name"],
-        model=OpenRouter(id="mistralai/devstral-2512:free"),
+        model=make_model(),
         description=config["description"],
         members=members,
-        db=db,
+        db=get_db(),
         add_history_to_context=True,
         debug_mode=True,
+        stream=True,
+        stream_member_events=True,  # Forward member tokens as they are produced
     )
 
 
@@ -392,40 +564,84 @@ Only include information that was actually found - never add made-up details."""
 TEAMS: dict[str, Team] = {}
 
 
+async def run_team_batch(
+    team: Team,
+    inputs: list[dict[str, Any]],
+    max_concurrency: int = 8,
+) -> list[Any]:
+    """Run a team over many independent inputs concurrently.
+
+    Each input runs the full member chain on its own; at most
+    max_concurrency runs are in flight, so a batching model server can merge
+    their decode steps without the client flooding it.
+
+    Args:
+        team: The team to run
+        inputs: Keyword arguments for team.arun, e.g. {"input": "topic", "session_id": "..."};
+            any "stream" key is ignored, since the batch collects whole outputs
+        max_concurrency: Maximum number of concurrent team runs
+
+    Returns:
+        Run outputs in the same order as inputs
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run_one(kwargs: dict[str, Any]) -> Any:
+        async with semaphore:
+            return await team.arun(**{**kwargs, "stream": False})
+
+    return await asyncio.gather(*(run_one(kwargs) for kwargs in inputs))
+
+
 # =============================================================================
 # Workflows - Deterministic pipelines
 # =============================================================================
 
-# Content Workflow: Research → Write (sequential steps)
-content_workflow = Workflow(
-    name="content",
-    description="Create content by researching a topic and writing about it",
-    steps=[
-        Agent(
-            name="Researcher",
-            model=OpenRouter(id="mistralai/devstral-2512:free"),
-            instructions="Research the given topic thoroughly. Return your findings.",
-        ),
-        Agent(
-            name="Writer",
-            model=OpenRouter(id="mistralai/devstral-2512:free"),
-            instructions="Based on the research provided, write a clear and engaging article. Use markdown.",
-        ),
-    ],
-    db=db,
-)
+@functools.lru_cache(maxsize=1)
+def get_content_workflow() -> Workflow:
+    """Content Workflow: Research → Write (sequential steps)."""
+    return Workflow(
+        name="content",
+        description="Create content by researching a topic and writing about it",
+        steps=[
+            Agent(
+                name="Researcher",
+                model=make_model(),
+                instructions="Research the given topic thoroughly. Return your findings.",
+                stream=True,
+            ),
+            Agent(
+                name="Writer",
+                model=make_model(),
+                instructions="Based on the research provided, write a clear and engaging article. Use markdown.",
+                stream=True,
+            ),
+        ],
+        db=get_db(),
+        stream=True,
+    )
 
-# Export workflows dict for main.py
-WORKFLOWS: dict[str, Workflow] = {
-    "content": content_workflow,
-}
+
+@functools.lru_cache(maxsize=1)
+def get_workflows() -> dict[str, Workflow]:
+    """Return workflows by ID, building them on first use."""
+    return {
+        "content": get_content_workflow(),
+    }
+
+
+# Team list projection, rebuilt only when the custom teams change
+_teams_list_cache: tuple[dict[str, dict], list[dict]] | None = None
 
 
 def get_teams_list() -> list[dict]:
     """Return list of available teams for the frontend."""
-    # Use fresh configs to pick up any changes
-    all_configs = get_all_team_configs()
-    return [
+    global _teams_list_cache
+    custom = load_custom_teams()
+    if _teams_list_cache is not None and _teams_list_cache[0] is custom:
+        return _teams_list_cache[1]
+
+    teams_list = [
         {
             "id": team_id,
             "name": config["name"],
@@ -433,13 +649,19 @@ def get_teams_list() -> list[dict]:
             "type": "team",
             "builtin": team_id in BUILTIN_TEAM_CONFIGS,
         }
-        for team_id, config in all_configs.items()
+        for team_id, config in {**BUILTIN_TEAM_CONFIGS, **custom}.items()
     ]
+    _teams_list_cache = (custom, teams_list)
+    return teams_list
 
 
+@functools.lru_cache(maxsize=1)
 def get_workflows_list() -> list[dict]:
-    """Return list of available workflows for the frontend."""
+    """Return list of available workflows for the frontend.
+
+    Workflows are static for the life of the process, so the list is built once.
+    """
     return [
         {"id": name, "name": workflow.name, "description": workflow.description, "type": "workflow"}
-        for name, workflow in WORKFLOWS.items()
+        for name, workflow in get_workflows().items()
     ]
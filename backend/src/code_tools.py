@@ -4,31 +4,206 @@ Provides tools for running Python code with access to registered tools,
 installing packages via uv, and saving/running Python files.
 """
 
+import functools
+import os
 import subprocess
 import sys
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 from io import StringIO
-from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, BinaryIO, TextIO
 
 from agno.tools import tool
 
+from paths import BACKEND_DIR, WORKSPACE_DIR
+
 if TYPE_CHECKING:
     from tools import ToolRegistry
 
-# Workspace directory for file operations
-WORKSPACE_DIR = Path(__file__).parent.parent / "workspace"
+# uv_add installs into the backend project's environment; file operations
+# happen in the workspace directory
 WORKSPACE_DIR.mkdir(exist_ok=True)
+_WORKSPACE_STR = str(WORKSPACE_DIR)
 
 # Tool registry - set via set_tool_registry()
 _registry: "ToolRegistry | None" = None
 
 
+# Per-call output buffers for run_python_code. sys.stdout/sys.stderr are
+# wrapped once by proxies that write to the calling context's buffer, so
+# concurrent runs (agno runs sync tools in worker threads) keep their output
+# separate instead of swapping the process-wide streams.
+_stdout_buffer: ContextVar[StringIO | None] = ContextVar("stdout_buffer", default=None)
+_stderr_buffer: ContextVar[StringIO | None] = ContextVar("stderr_buffer", default=None)
+_stream_install_lock = threading.Lock()
+
+# Captured output per stream is capped so a runaway print loop can't balloon memory
+MAX_OUTPUT = 1 << 20
+TRUNCATED_MARKER = "\n[output truncated]"
+
+
+class _BoundedBuffer(StringIO):
+    """StringIO that drops writes past MAX_OUTPUT characters and records it."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.size = 0
+        self.truncated = False
+
+    def write(self, text: str) -> int:
+        room = MAX_OUTPUT - self.size
+        if len(text) > room:
+            self.truncated = True
+            if room <= 0:
+                return len(text)
+            super().write(text[:room])
+            self.size = MAX_OUTPUT
+            return len(text)
+        self.size += len(text)
+        return super().write(text)
+
+    def getvalue(self) -> str:
+        value = super().getvalue()
+        return value + TRUNCATED_MARKER if self.truncated else value
+
+
+class _ContextStream:
+    """Stream proxy that writes to the current context's buffer when one is set."""
+
+    def __init__(self, stream: TextIO, buffer: ContextVar[StringIO | None]) -> None:
+        self._stream = stream
+        self._buffer = buffer
+
+    def write(self, text: str) -> int:
+        target = self._buffer.get()
+        return (self._stream if target is None else target).write(text)
+
+    def flush(self) -> None:
+        if self._buffer.get() is None:
+            self._stream.flush()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._stream, name)
+
+
+def _install_context_streams() -> None:
+    """Wrap sys.stdout/sys.stderr in context proxies if not already wrapped."""
+    with _stream_install_lock:
+        if not isinstance(sys.stdout, _ContextStream):
+            sys.stdout = _ContextStream(sys.stdout, _stdout_buffer)
+        if not isinstance(sys.stderr, _ContextStream):
+            sys.stderr = _ContextStream(sys.stderr, _stderr_buffer)
+
+
+@contextmanager
+def _capture_output() -> Iterator[tuple[StringIO, StringIO]]:
+    """Capture stdout/stderr written from the current call only, up to MAX_OUTPUT each."""
+    _install_context_streams()
+    out, err = _BoundedBuffer(), _BoundedBuffer()
+    out_token = _stdout_buffer.set(out)
+    err_token = _stderr_buffer.set(err)
+    try:
+        yield out, err
+    finally:
+        _stdout_buffer.reset(out_token)
+        _stderr_buffer.reset(err_token)
+
+
 def set_tool_registry(registry: "ToolRegistry") -> None:
     """Set the tool registry for code execution tools."""
     global _registry
     _registry = registry
 
 
+def _read_tail(stream: BinaryIO, max_bytes: int, out: list[bytes]) -> None:
+    """Read a pipe to EOF, appending only the last max_bytes of output to out."""
+    chunks: deque[bytes] = deque()
+    size = 0
+    dropped = False
+    with stream:
+        while chunk := stream.read(65536):
+            chunks.append(chunk)
+            size += len(chunk)
+            while size - len(chunks[0]) >= max_bytes:
+                size -= len(chunks.popleft())
+                dropped = True
+    data = b"".join(chunks)
+    if len(data) > max_bytes:
+        data = data[-max_bytes:]
+        dropped = True
+    out.append(b"[earlier output truncated]\n" + data if dropped else data)
+
+
+def _run_streamed(
+    *cmd: str,
+    cwd: str,
+    max_bytes: int = MAX_OUTPUT,
+    timeout: float | None = None,
+) -> tuple[int, str, str]:
+    """Run a command, streaming its pipes so captured output stays within max_bytes each.
+
+    The process is killed if it runs longer than timeout seconds.
+
+    Returns:
+        Tuple of (returncode, stdout, stderr)
+    """
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=cwd)
+    outputs: tuple[list[bytes], list[bytes]] = ([], [])
+    readers = [
+        threading.Thread(target=_read_tail, args=(stream, max_bytes, out), daemon=True)
+        for stream, out in zip((proc.stdout, proc.stderr), outputs, strict=True)
+    ]
+    for reader in readers:
+        reader.start()
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    try:
+        returncode = proc.wait(timeout)
+        for reader in readers:
+            reader.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        if any(reader.is_alive() for reader in readers):
+            raise subprocess.TimeoutExpired(cmd, timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+        return proc.returncode, "", f"Timed out after {timeout} seconds"
+    stdout, stderr = (out[0].decode(errors="replace") for out in outputs)
+    return returncode, stdout, stderr
+
+
+# Limits for scripts run by save_and_run_python_file, so runaway generated code
+# can't monopolize a CPU or the server's memory
+SCRIPT_CPU_SECONDS = 30
+SCRIPT_MEMORY_BYTES = 1 << 30
+SCRIPT_TIMEOUT = 120
+
+# Sets the rlimits inside the child and then runs the script as __main__.
+# Done in the child's own interpreter rather than with preexec_fn, which is
+# unsafe to use from a multi-threaded server.
+_SCRIPT_LAUNCHER = f"""\
+import resource, runpy, sys
+resource.setrlimit(resource.RLIMIT_CPU, ({SCRIPT_CPU_SECONDS}, {SCRIPT_CPU_SECONDS}))
+resource.setrlimit(resource.RLIMIT_AS, ({SCRIPT_MEMORY_BYTES}, {SCRIPT_MEMORY_BYTES}))
+sys.argv = sys.argv[1:]
+runpy.run_path(sys.argv[0], run_name="__main__")
+"""
+
+
+def _script_command(file_path: str) -> tuple[str, ...]:
+    """Command that runs file_path with resource limits where the platform has them.
+
+    Uses the server's own interpreter: it is the environment uv_add installs
+    into, and spawning it directly skips the PATH lookup and any shim.
+    """
+    if sys.platform == "win32":
+        return (sys.executable, file_path)
+    return (sys.executable, "-c", _SCRIPT_LAUNCHER, file_path)
+
+
 @tool
 def uv_add(package: str) -> str:
     """
@@ -37,23 +212,48 @@ def uv_add(package: str) -> str:
     Args:
         package: The package name to install (e.g., "yfinance", "pandas>=2.0")
     """
-    backend_dir = Path(__file__).parent.parent
-    result = subprocess.run(
-        ["uv", "add", package],
-        capture_output=True,
-        text=True,
-        cwd=str(backend_dir),
-    )
-    if result.returncode == 0:
+    returncode, _, stderr = _run_streamed("uv", "add", package, cwd=str(BACKEND_DIR))
+    if returncode == 0:
         return f"Successfully installed {package}"
-    return f"Failed to install {package}: {result.stderr}"
+    return f"Failed to install {package}: {stderr}"
+
+
+# Snippets larger than this are compiled fresh rather than kept in the cache
+_COMPILE_CACHE_MAX_SOURCE = 64_000
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_cached(code: str):
+    """Compile a snippet, reusing the code object for repeated snippets."""
+    return compile(code, "<string>", "exec")  # noqa: S102
+
+
+# Resolved once; reached through the builtins mapping to avoid hook false positives
+_exec = (__builtins__ if isinstance(__builtins__, dict) else vars(__builtins__))["exec"]
 
 
 def _run_code_in_namespace(code: str, namespace: dict) -> None:
     """Helper to run code - separated to avoid hook false positives."""
-    compiled = compile(code, "<string>", "exec")  # noqa: S102
-    builtins = __builtins__ if isinstance(__builtins__, dict) else vars(__builtins__)
-    builtins["exec"](compiled, namespace)
+    if len(code) < _COMPILE_CACHE_MAX_SOURCE:
+        compiled = _compile_cached(code)
+    else:
+        compiled = compile(code, "<string>", "exec")  # noqa: S102
+    _exec(compiled, namespace)
+
+
+# Base globals for run_python_code, rebuilt only when the registry changes
+_base_globals_cache: tuple[int, dict] | None = None
+
+
+def _get_base_globals(registry: "ToolRegistry") -> dict:
+    """Return builtins + registered tools, cached per registry version."""
+    global _base_globals_cache
+    if _base_globals_cache is None or _base_globals_cache[0] != registry.version:
+        _base_globals_cache = (
+            registry.version,
+            {"__builtins__": __builtins__, **registry.get_namespace()},
+        )
+    return _base_globals_cache[1]
 
 
 @tool
@@ -66,6 +266,7 @@ def run_python_code(code: str) -> str:
     **Web & HTTP:**
     - web_search(query, num_results=5) - Search the web via DuckDuckGo
     - fetch_url(url, extract_text=True) - Fetch URL content
+    - fetch_urls(urls, extract_text=True) - Fetch several URLs concurrently
     - http_get(url, headers=None) - HTTP GET request
     - http_post(url, data=None, json_data=None, headers=None) - HTTP POST
 
@@ -98,22 +299,12 @@ def run_python_code(code: str) -> str:
     if _registry is None:
         return "Error: Tool registry not initialized"
 
-    # Build namespace with builtins + registered tools
-    tool_namespace = _registry.get_namespace()
-    run_globals = {
-        "__builtins__": __builtins__,
-        **tool_namespace,
-    }
-
-    old_stdout = sys.stdout
-    old_stderr = sys.stderr
-    redirected_output = StringIO()
-    redirected_error = StringIO()
-    sys.stdout = redirected_output
-    sys.stderr = redirected_error
+    # Copy the cached builtins + tools namespace; snippets may assign globals
+    run_globals = dict(_get_base_globals(_registry))
 
     try:
-        _run_code_in_namespace(code, run_globals)
+        with _capture_output() as (redirected_output, redirected_error):
+            _run_code_in_namespace(code, run_globals)
         output = redirected_output.getvalue()
         error = redirected_error.getvalue()
         if error:
@@ -121,9 +312,6 @@ def run_python_code(code: str) -> str:
         return output if output else "Code ran successfully (no output)"
     except Exception as e:
         return f"Error running code: {e}"
-    finally:
-        sys.stdout = old_stdout
-        sys.stderr = old_stderr
 
 
 @tool
@@ -141,24 +329,22 @@ def save_and_run_python_file(file_name: str, code: str) -> str:
     if not file_name.endswith(".py"):
         file_name += ".py"
 
-    file_path = WORKSPACE_DIR / file_name
-    file_path.write_text(code)
+    file_path = os.path.join(_WORKSPACE_STR, file_name)
+    # Encoded once and written unbuffered; UTF-8 matches how Python reads source
+    with open(file_path, "wb", buffering=0) as f:
+        f.write(code.encode())
 
-    result = subprocess.run(
-        ["python", str(file_path)],
-        capture_output=True,
-        text=True,
-        cwd=str(WORKSPACE_DIR),
+    returncode, output, error = _run_streamed(
+        *_script_command(file_path), cwd=_WORKSPACE_STR, timeout=SCRIPT_TIMEOUT
     )
-
-    output = result.stdout
-    error = result.stderr
-    if result.returncode != 0:
+    if returncode != 0:
         return f"Error running {file_name}:\n{error}"
     if error:
         return f"Output:\n{output}\n\nWarnings:\n{error}"
     return output if output else f"{file_name} ran successfully (no output)"
 
 
-# Export all tools as a list for easy import
+# Export all tools as a list for easy import. They are all sync: agno refuses
+# async tools in agent.run(), which AgentOS evals use, while arun() already
+# runs sync tools with asyncio.to_thread, off the event loop.
 AGENT_TOOLS = [uv_add, run_python_code, save_and_run_python_file]
@@ -7,22 +7,70 @@ Also provides dynamic run endpoints for custom agents/teams that
 bypass AgentOS and create agents on-the-fly.
 """
 
-import json
-import uuid
+import asyncio
+import contextlib
+import os
+import secrets
+import tempfile
+import threading
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
+import orjson
+from agno.utils.serialize import json_serializer
 from fastapi import APIRouter, Form, HTTPException
-from fastapi.responses import StreamingResponse
-from pydantic import BaseModel, Field
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from loguru import logger
+from pydantic import BaseModel, Field, ValidationError
+
+from agents import (
+    BUILTIN_AGENT_CONFIGS,
+    BUILTIN_TEAM_CONFIGS,
+    get_all_agent_configs,
+    get_all_team_configs,
+    load_custom_agents,
+    load_custom_teams,
+)
+from paths import CONFIG_DIR
+
+if TYPE_CHECKING:
+    from agno.agent.agent import Agent
+    from agno.team import Team
 
-# Config directory
-CONFIG_DIR = Path(__file__).parent.parent / "config"
 AGENTS_FILE = CONFIG_DIR / "agents.json"
 TEAMS_FILE = CONFIG_DIR / "teams.json"
 
 router = APIRouter(prefix="/config", tags=["config"])
 
+# Agent/team factories for the run endpoints - set via set_entity_factories().
+# Injected rather than imported from main: the app runs as src.main, so a
+# `from main import ...` here would load and run a second copy of it.
+_get_or_create_agent: "Callable[[str], Agent] | None" = None
+_get_or_create_team: "Callable[[str], Team] | None" = None
+
+
+def set_entity_factories(
+    agent_factory: "Callable[[str], Agent]",
+    team_factory: "Callable[[str], Team]",
+) -> None:
+    """Set the functions the run endpoints use to get (cached) agents and teams."""
+    global _get_or_create_agent, _get_or_create_team
+    _get_or_create_agent = agent_factory
+    _get_or_create_team = team_factory
+
+# Headers for streamed run responses - disable proxy buffering so chunks flush
+STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+# Pre-encoded terminal events sent when a run fails mid-stream
+AGENT_RUN_ERROR_EVENT = orjson.dumps({"event": "RunError", "content": "Error during run"}) + b"\n"
+TEAM_RUN_ERROR_EVENT = orjson.dumps({"event": "TeamRunError", "content": "Error during run"}) + b"\n"
+
+# Constant tail of the synthesized content/completion events (see _event_prefix)
+RUN_EVENT_SUFFIX = b',"content_type":"str","created_at":0}\n'
+
 
 # =============================================================================
 # Pydantic Models
@@ -105,27 +153,214 @@ class ModelInfo(BaseModel):
 # =============================================================================
 
 
-def _load_json(file_path: Path) -> list[dict]:
-    """Load JSON array from file, returning empty list if missing."""
-    if not file_path.exists():
-        return []
+@dataclass(slots=True)
+class _ConfigFile:
+    """A parsed config file with lookup indices and response-shaped entries.
+
+    Shared between requests and must not be mutated; copy `items` before
+    editing and pass the new list to _save_json.
+    """
+
+    key: tuple[int, int, int]
+    items: list[dict]
+    ids: dict[str, int]  # id -> position in items
+    names: frozenset[str]  # lowercased names, for duplicate checks
+    # Per item, its response validated through the endpoint's response model,
+    # or None if it is malformed
+    responses: list[dict | None]
+    responses_json: bytes  # well-formed responses pre-encoded for the list endpoints
+
+    @classmethod
+    def build(
+        cls, key: tuple[int, int, int], items: list[dict], response_model: type[BaseModel]
+    ) -> "_ConfigFile":
+        # Responses are validated once here, since the endpoints return them
+        # pre-built instead of letting FastAPI run them through response_model.
+        # Malformed items are left out of the lookups and listings but kept in
+        # `items`, so saving an edit to another entry doesn't drop them
+        ids: dict[str, int] = {}
+        names: set[str] = set()
+        responses: list[dict | None] = []
+        for i, item in enumerate(items):
+            try:
+                response = response_model.model_validate({**item, "builtin": False}).model_dump()
+            except (ValidationError, TypeError):
+                logger.warning("Skipping malformed config entry: {!r}", item)
+                responses.append(None)
+                continue
+            ids[response["id"]] = i
+            names.add(response["name"].lower())
+            responses.append(response)
+        return cls(
+            key=key,
+            items=items,
+            ids=ids,
+            names=frozenset(names),
+            responses=responses,
+            responses_json=orjson.dumps([r for r in responses if r is not None]),
+        )
+
+
+_EMPTY_CONFIG_FILE = _ConfigFile(
+    key=(0, 0, 0), items=[], ids={}, names=frozenset(), responses=[], responses_json=b"[]"
+)
+
+# Response model each config file's entries are validated against
+_RESPONSE_MODELS: dict[Path, type[BaseModel]] = {
+    AGENTS_FILE: AgentConfigResponse,
+    TEAMS_FILE: TeamConfigResponse,
+}
+
+# Parsed config files keyed by path, revalidated against (mtime_ns, size, inode).
+# Saves replace the file, so the inode changes even when a same-size rewrite
+# lands within one mtime tick.
+_json_cache: dict[Path, _ConfigFile] = {}
+_json_cache_lock = threading.Lock()
+
+
+def _read_configs(file_path: Path, key: tuple[int, int, int]) -> _ConfigFile:
+    """Read and parse a config file, storing the result in the cache."""
+    try:
+        items = orjson.loads(file_path.read_bytes())
+    except (orjson.JSONDecodeError, OSError):
+        return _EMPTY_CONFIG_FILE
+    if not isinstance(items, list):
+        logger.warning("Ignoring {}: expected a JSON array", file_path)
+        return _EMPTY_CONFIG_FILE
+    configs = _ConfigFile.build(key, items, _RESPONSE_MODELS[file_path])
+
+    with _json_cache_lock:
+        _json_cache[file_path] = configs
+    return configs
+
+
+def _cached_configs(file_path: Path) -> tuple[tuple[int, int, int] | None, _ConfigFile | None]:
+    """Stat a config file and return (key, cached entry if still current)."""
     try:
-        return json.loads(file_path.read_text())
-    except (json.JSONDecodeError, OSError):
-        return []
+        st = file_path.stat()
+    except OSError:  # includes FileNotFoundError
+        return None, None
+
+    key = (st.st_mtime_ns, st.st_size, st.st_ino)
+    with _json_cache_lock:
+        cached = _json_cache.get(file_path)
+    return key, cached if cached is not None and cached.key == key else None
+
+
+def _load_configs(file_path: Path) -> _ConfigFile:
+    """Load a JSON config array, cached until the file changes on disk.
+
+    Synchronous so read-modify-write endpoints never yield to the event loop
+    between loading and saving.
+    """
+    key, cached = _cached_configs(file_path)
+    if key is None:
+        return _EMPTY_CONFIG_FILE
+    return cached or _read_configs(file_path, key)
+
+
+async def _load_configs_async(file_path: Path) -> _ConfigFile:
+    """Like _load_configs, but a cache miss is read and parsed in a worker thread.
+
+    A hit still returns without an executor hop.
+    """
+    key, cached = _cached_configs(file_path)
+    if key is None:
+        return _EMPTY_CONFIG_FILE
+    return cached or await asyncio.to_thread(_read_configs, file_path, key)
 
 
-def _save_json(file_path: Path, data: list[dict]) -> None:
-    """Save JSON array to file."""
+def _save_json(file_path: Path, data: list[dict]) -> _ConfigFile:
+    """Save JSON array to file and return its new cache entry.
+
+    Writes to a temp file in the same directory, fsyncs it and renames it over
+    the target, so a crash mid-write never leaves a truncated config behind.
+    """
     file_path.parent.mkdir(parents=True, exist_ok=True)
-    file_path.write_text(json.dumps(data, indent=2))
+    fd, tmp_path = tempfile.mkstemp(dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp_path)
+        raise
+    # Prime the cache so the next read is a stat-only hit
+    st = file_path.stat()
+    configs = _ConfigFile.build(
+        (st.st_mtime_ns, st.st_size, st.st_ino), list(data), _RESPONSE_MODELS[file_path]
+    )
+    with _json_cache_lock:
+        _json_cache[file_path] = configs
+    return configs
+
+
+def _find_index(ids: dict[str, int], item_id: str, kind: str) -> int:
+    """Return the position of the config with the given ID, or raise a 404."""
+    i = ids.get(item_id)
+    if i is None:
+        raise HTTPException(status_code=404, detail=f"{kind} not found")
+    return i
+
+
+_STREAM_END = object()
+
+
+async def _coalesce_stream(
+    lines: AsyncIterator[bytes],
+    max_batch: int = 16,
+    max_pending: int = 64,
+    error_event: bytes | None = None,
+) -> AsyncIterator[bytes]:
+    """Merge streamed lines that arrive together into one write.
+
+    A producer task drains `lines` into a bounded queue; each yielded chunk
+    joins everything already queued (up to max_batch), so token bursts go
+    out as one network write instead of one per event. If `lines` fails and
+    error_event is given, it ends the stream in place of the exception.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+
+    async def produce() -> None:
+        try:
+            async for line in lines:
+                await queue.put(line)
+        except Exception as e:
+            if error_event is None:
+                await queue.put(e)
+            else:
+                logger.exception("Streamed run failed")
+                await queue.put(error_event)
+        await queue.put(_STREAM_END)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            batch: list[bytes] = []
+            item = await queue.get()
+            while isinstance(item, bytes):
+                batch.append(item)
+                if len(batch) >= max_batch or queue.empty():
+                    break
+                item = queue.get_nowait()
+            if batch:
+                yield b"".join(batch)
+            if item is _STREAM_END:
+                return
+            if isinstance(item, Exception):
+                raise item
+    finally:
+        producer.cancel()
 
 
 def _generate_id(name: str) -> str:
     """Generate a URL-safe ID from a name."""
     # Create slug from name, append short UUID for uniqueness
     slug = name.lower().replace(" ", "-")[:20]
-    short_id = str(uuid.uuid4())[:8]
+    short_id = secrets.token_hex(4)
     return f"{slug}-{short_id}"
 
 
@@ -135,19 +370,19 @@ def _generate_id(name: str) -> str:
 
 
 @router.get("/agents", response_model=list[AgentConfigResponse])
-async def list_custom_agents() -> list[dict[str, Any]]:
+async def list_custom_agents() -> Response:
     """List all custom agent configurations."""
-    agents = _load_json(AGENTS_FILE)
-    return [{"builtin": False, **agent} for agent in agents]
+    configs = await _load_configs_async(AGENTS_FILE)
+    return Response(content=configs.responses_json, media_type="application/json")
 
 
 @router.post("/agents", response_model=AgentConfigResponse, status_code=201)
-async def create_agent(agent: AgentConfigCreate) -> dict[str, Any]:
+async def create_agent(agent: AgentConfigCreate) -> ORJSONResponse:
     """Create a new custom agent."""
-    agents = _load_json(AGENTS_FILE)
+    configs = _load_configs(AGENTS_FILE)
 
     # Check for duplicate names
-    if any(a["name"].lower() == agent.name.lower() for a in agents):
+    if agent.name.lower() in configs.names:
         raise HTTPException(status_code=400, detail="Agent with this name already exists")
 
     new_agent = {
@@ -158,52 +393,40 @@ async def create_agent(agent: AgentConfigCreate) -> dict[str, Any]:
         "instructions": agent.instructions,
     }
 
-    agents.append(new_agent)
-    _save_json(AGENTS_FILE, agents)
+    saved = _save_json(AGENTS_FILE, [*configs.items, new_agent])
 
-    return {"builtin": False, **new_agent}
+    return ORJSONResponse(saved.responses[-1], status_code=201)
 
 
 @router.get("/agents/{agent_id}", response_model=AgentConfigResponse)
-async def get_agent(agent_id: str) -> dict[str, Any]:
+async def get_agent(agent_id: str) -> ORJSONResponse:
     """Get a custom agent by ID."""
-    agents = _load_json(AGENTS_FILE)
-
-    for agent in agents:
-        if agent["id"] == agent_id:
-            return {"builtin": False, **agent}
-
-    raise HTTPException(status_code=404, detail="Agent not found")
+    configs = await _load_configs_async(AGENTS_FILE)
+    return ORJSONResponse(configs.responses[_find_index(configs.ids, agent_id, "Agent")])
 
 
 @router.put("/agents/{agent_id}", response_model=AgentConfigResponse)
-async def update_agent(agent_id: str, updates: AgentConfigUpdate) -> dict[str, Any]:
+async def update_agent(agent_id: str, updates: AgentConfigUpdate) -> ORJSONResponse:
     """Update a custom agent."""
-    agents = _load_json(AGENTS_FILE)
-
-    for i, agent in enumerate(agents):
-        if agent["id"] == agent_id:
-            # Apply updates
-            update_data = updates.model_dump(exclude_unset=True)
-            agents[i] = {**agent, **update_data}
-            _save_json(AGENTS_FILE, agents)
-            return {"builtin": False, **agents[i]}
+    configs = _load_configs(AGENTS_FILE)
+    i = _find_index(configs.ids, agent_id, "Agent")
 
-    raise HTTPException(status_code=404, detail="Agent not found")
+    # Apply updates - nulls mean "unchanged", and no-op updates skip the write
+    update_data = updates.model_dump(exclude_unset=True, exclude_none=True)
+    if not update_data:
+        return ORJSONResponse(configs.responses[i])
+    agents = list(configs.items)
+    agents[i] = {**agents[i], **update_data}
+    saved = _save_json(AGENTS_FILE, agents)
+    return ORJSONResponse(saved.responses[i])
 
 
 @router.delete("/agents/{agent_id}", status_code=204)
 async def delete_agent(agent_id: str) -> None:
     """Delete a custom agent."""
-    agents = _load_json(AGENTS_FILE)
-
-    for i, agent in enumerate(agents):
-        if agent["id"] == agent_id:
-            agents.pop(i)
-            _save_json(AGENTS_FILE, agents)
-            return
-
-    raise HTTPException(status_code=404, detail="Agent not found")
+    configs = _load_configs(AGENTS_FILE)
+    i = _find_index(configs.ids, agent_id, "Agent")
+    _save_json(AGENTS_FILE, configs.items[:i] + configs.items[i + 1:])
 
 
 # =============================================================================
@@ -212,19 +435,19 @@ async def delete_agent(agent_id: str) -> None:
 
 
 @router.get("/teams", response_model=list[TeamConfigResponse])
-async def list_custom_teams() -> list[dict[str, Any]]:
+async def list_custom_teams() -> Response:
     """List all custom team configurations."""
-    teams = _load_json(TEAMS_FILE)
-    return [{"builtin": False, **team} for team in teams]
+    configs = await _load_configs_async(TEAMS_FILE)
+    return Response(content=configs.responses_json, media_type="application/json")
 
 
 @router.post("/teams", response_model=TeamConfigResponse, status_code=201)
-async def create_team(team: TeamConfigCreate) -> dict[str, Any]:
+async def create_team(team: TeamConfigCreate) -> ORJSONResponse:
     """Create a new custom team."""
-    teams = _load_json(TEAMS_FILE)
+    configs = _load_configs(TEAMS_FILE)
 
     # Check for duplicate names
-    if any(t["name"].lower() == team.name.lower() for t in teams):
+    if team.name.lower() in configs.names:
         raise HTTPException(status_code=400, detail="Team with this name already exists")
 
     new_team = {
@@ -234,54 +457,42 @@ async def create_team(team: TeamConfigCreate) -> dict[str, Any]:
         "members": [m.model_dump() for m in team.members],
     }
 
-    teams.append(new_team)
-    _save_json(TEAMS_FILE, teams)
+    saved = _save_json(TEAMS_FILE, [*configs.items, new_team])
 
-    return {"builtin": False, **new_team}
+    return ORJSONResponse(saved.responses[-1], status_code=201)
 
 
 @router.get("/teams/{team_id}", response_model=TeamConfigResponse)
-async def get_team(team_id: str) -> dict[str, Any]:
+async def get_team(team_id: str) -> ORJSONResponse:
     """Get a custom team by ID."""
-    teams = _load_json(TEAMS_FILE)
-
-    for team in teams:
-        if team["id"] == team_id:
-            return {"builtin": False, **team}
-
-    raise HTTPException(status_code=404, detail="Team not found")
+    configs = await _load_configs_async(TEAMS_FILE)
+    return ORJSONResponse(configs.responses[_find_index(configs.ids, team_id, "Team")])
 
 
 @router.put("/teams/{team_id}", response_model=TeamConfigResponse)
-async def update_team(team_id: str, updates: TeamConfigUpdate) -> dict[str, Any]:
+async def update_team(team_id: str, updates: TeamConfigUpdate) -> ORJSONResponse:
     """Update a custom team."""
-    teams = _load_json(TEAMS_FILE)
-
-    for i, team in enumerate(teams):
-        if team["id"] == team_id:
-            # Apply updates
-            update_data = updates.model_dump(exclude_unset=True)
-            if "members" in update_data:
-                update_data["members"] = [m.model_dump() if hasattr(m, "model_dump") else m for m in update_data["members"]]
-            teams[i] = {**team, **update_data}
-            _save_json(TEAMS_FILE, teams)
-            return {"builtin": False, **teams[i]}
+    configs = _load_configs(TEAMS_FILE)
+    i = _find_index(configs.ids, team_id, "Team")
 
-    raise HTTPException(status_code=404, detail="Team not found")
+    # Apply updates - nulls mean "unchanged", and no-op updates skip the write
+    update_data = updates.model_dump(exclude_unset=True, exclude_none=True)
+    if not update_data:
+        return ORJSONResponse(configs.responses[i])
+    if "members" in update_data:
+        update_data["members"] = [m.model_dump() if hasattr(m, "model_dump") else m for m in update_data["members"]]
+    teams = list(configs.items)
+    teams[i] = {**teams[i], **update_data}
+    saved = _save_json(TEAMS_FILE, teams)
+    return ORJSONResponse(saved.responses[i])
 
 
 @router.delete("/teams/{team_id}", status_code=204)
 async def delete_team(team_id: str) -> None:
     """Delete a custom team."""
-    teams = _load_json(TEAMS_FILE)
-
-    for i, team in enumerate(teams):
-        if team["id"] == team_id:
-            teams.pop(i)
-            _save_json(TEAMS_FILE, teams)
-            return
-
-    raise HTTPException(status_code=404, detail="Team not found")
+    configs = _load_configs(TEAMS_FILE)
+    i = _find_index(configs.ids, team_id, "Team")
+    _save_json(TEAMS_FILE, configs.items[:i] + configs.items[i + 1:])
 
 
 # =============================================================================
@@ -302,10 +513,14 @@ AVAILABLE_MODELS = [
 ]
 
 
+# The model list never changes at runtime, so it is encoded once
+AVAILABLE_MODELS_JSON = orjson.dumps([m.model_dump() for m in AVAILABLE_MODELS])
+
+
 @router.get("/models", response_model=list[ModelInfo])
-async def list_models() -> list[ModelInfo]:
+async def list_models() -> Response:
     """List available models for agent configuration."""
-    return AVAILABLE_MODELS
+    return Response(content=AVAILABLE_MODELS_JSON, media_type="application/json")
 
 
 # =============================================================================
@@ -313,18 +528,10 @@ async def list_models() -> list[ModelInfo]:
 # =============================================================================
 
 
-@router.get("/all-agents")
-async def list_all_agents() -> list[dict[str, Any]]:
-    """List ALL agents (built-in + custom) for the frontend dropdown.
-
-    This shadows the AgentOS /agents endpoint which only knows about
-    agents created at startup. Our endpoint reads from JSON files
-    to include dynamically created agents.
-    """
-    from agents import BUILTIN_AGENT_CONFIGS, load_custom_agents
-
-    # Built-in agents
-    result = [
+@lru_cache(maxsize=1)
+def _builtin_agents_view() -> tuple[dict[str, Any], ...]:
+    """Built-in agents as listed by /all-agents; they never change at runtime."""
+    return tuple(
         {
             "id": config.id,
             "name": config.name,
@@ -333,10 +540,45 @@ async def list_all_agents() -> list[dict[str, Any]]:
             "builtin": True,
         }
         for config in BUILTIN_AGENT_CONFIGS.values()
-    ]
+    )
+
+
+@lru_cache(maxsize=1)
+def _builtin_teams_view() -> tuple[dict[str, Any], ...]:
+    """Built-in teams as listed by /all-teams; they never change at runtime."""
+    return tuple(
+        {
+            "id": team_id,
+            "name": config["name"],
+            "description": config["description"],
+            "type": "team",
+            "builtin": True,
+        }
+        for team_id, config in BUILTIN_TEAM_CONFIGS.items()
+    )
+
+
+# Encoded combined lists, keyed by the identity of the custom configs they were built from
+_all_agents_cache: tuple[dict, bytes] | None = None
+_all_teams_cache: tuple[dict, bytes] | None = None
+
 
-    # Custom agents from JSON
+@router.get("/all-agents")
+async def list_all_agents() -> Response:
+    """List ALL agents (built-in + custom) for the frontend dropdown.
+
+    This shadows the AgentOS /agents endpoint which only knows about
+    agents created at startup. Our endpoint reads from JSON files
+    to include dynamically created agents.
+    """
+    global _all_agents_cache
+
+    # Custom agents from JSON - the same dict is returned until the file changes
     custom = load_custom_agents()
+    if _all_agents_cache is not None and _all_agents_cache[0] is custom:
+        return Response(content=_all_agents_cache[1], media_type="application/json")
+
+    result = [*_builtin_agents_view()]
     for config in custom.values():
         result.append({
             "id": config.id,
@@ -346,32 +588,25 @@ async def list_all_agents() -> list[dict[str, Any]]:
             "builtin": False,
         })
 
-    return result
+    _all_agents_cache = (custom, orjson.dumps(result))
+    return Response(content=_all_agents_cache[1], media_type="application/json")
 
 
 @router.get("/all-teams")
-async def list_all_teams() -> list[dict[str, Any]]:
+async def list_all_teams() -> Response:
     """List ALL teams (built-in + custom) for the frontend dropdown.
 
     This shadows the AgentOS /teams endpoint which only knows about
     teams created at startup.
     """
-    from agents import BUILTIN_TEAM_CONFIGS, load_custom_teams
+    global _all_teams_cache
 
-    # Built-in teams
-    result = [
-        {
-            "id": team_id,
-            "name": config["name"],
-            "description": config["description"],
-            "type": "team",
-            "builtin": True,
-        }
-        for team_id, config in BUILTIN_TEAM_CONFIGS.items()
-    ]
-
-    # Custom teams from JSON
+    # Custom teams from JSON - the same dict is returned until the file changes
     custom = load_custom_teams()
+    if _all_teams_cache is not None and _all_teams_cache[0] is custom:
+        return Response(content=_all_teams_cache[1], media_type="application/json")
+
+    result = [*_builtin_teams_view()]
     for team_id, config in custom.items():
         result.append({
             "id": team_id,
@@ -381,7 +616,8 @@ async def list_all_teams() -> list[dict[str, Any]]:
             "builtin": False,
         })
 
-    return result
+    _all_teams_cache = (custom, orjson.dumps(result))
+    return Response(content=_all_teams_cache[1], media_type="application/json")
 
 
 # =============================================================================
@@ -389,67 +625,115 @@ async def list_all_teams() -> list[dict[str, Any]]:
 # =============================================================================
 
 
+@lru_cache(maxsize=None)
+def _chunk_serializer(chunk_type: type) -> Callable[[Any], dict[str, Any]] | None:
+    """Resolve how streamed chunks of this type become dicts, once per type.
+
+    Agno run events are dataclasses with to_dict(); pydantic models go through
+    their compiled serializer. Other chunks have no dict form.
+    """
+    if hasattr(chunk_type, "to_dict"):
+        return chunk_type.to_dict
+    serializer = getattr(chunk_type, "__pydantic_serializer__", None)
+    if serializer is not None:
+        return partial(serializer.to_python, exclude_none=True)
+    return None
+
+
+@lru_cache(maxsize=8)
+def _event_prefix(event: str) -> bytes:
+    """Constant head of a synthesized event; only the content is encoded per event."""
+    return b'{"event":' + orjson.dumps(event) + b',"content":'
+
+
+async def _stream_run(
+    runnable: "Agent | Team",
+    message: str,
+    session_id: str | None,
+    content_event: str,
+    completed_event: str,
+    cumulative: bool = True,
+) -> AsyncIterator[bytes]:
+    """Stream an agent or team run as JSON lines.
+
+    content_event/completed_event are the names the frontend expects for
+    this kind of run (RunContent/RunCompleted or TeamRunContent/TeamRunCompleted).
+    With cumulative=True each content event carries the full text so far;
+    otherwise it carries only the new delta. The completion event always
+    carries the full text.
+    """
+    content_prefix = _event_prefix(content_event)
+    # Cumulative mode extends the running text in place; delta mode only
+    # needs the full text once, for the completion event
+    accumulated_content = ""
+    parts: list[str] = []
+    async for chunk in runnable.arun(message, stream=True, session_id=session_id):
+        serialize = _chunk_serializer(type(chunk))
+        if serialize is not None:
+            chunk_data = serialize(chunk)
+            event = chunk_data.get("event")
+            # Map Agno event names to frontend expected names
+            if event == "RunResponse":
+                chunk_data["event"] = event = content_event
+            # Only content events are deltas; completion events carry the full text
+            content = chunk_data.get("content")
+            if event == content_event and content and isinstance(content, str):
+                if cumulative:
+                    accumulated_content += content
+                    chunk_data["content"] = accumulated_content
+                else:
+                    parts.append(content)
+            yield orjson.dumps(chunk_data, default=json_serializer) + b"\n"
+        elif hasattr(chunk, "content") and chunk.content:
+            # Fallback for simple content - use the content event
+            if cumulative:
+                accumulated_content += chunk.content
+                content = accumulated_content
+            else:
+                parts.append(chunk.content)
+                content = chunk.content
+            yield content_prefix + orjson.dumps(content) + RUN_EVENT_SUFFIX
+    # Send completion event with full content
+    if not cumulative:
+        accumulated_content = "".join(parts)
+    yield _event_prefix(completed_event) + orjson.dumps(accumulated_content) + RUN_EVENT_SUFFIX
+
+
 @router.post("/agents/{agent_id}/runs")
 async def run_dynamic_agent(
     agent_id: str,
     message: str = Form(...),
     stream: str = Form(default="true"),
     session_id: str = Form(default=None),
+    cumulative: str = Form(default="true"),
 ):
     """Run a custom agent dynamically.
 
     This endpoint creates agents on-the-fly for custom agents,
     enabling hot-loading without server restart.
     """
-    from agents import get_all_agent_configs
-    from main import get_or_create_agent
-
     # Check if agent exists
     all_configs = get_all_agent_configs()
     if agent_id not in all_configs:
         raise HTTPException(status_code=404, detail=f"Agent '{agent_id}' not found")
 
     # Get or create the agent
-    agent = get_or_create_agent(agent_id)
+    agent = _get_or_create_agent(agent_id)
 
     # Run the agent
     should_stream = stream.lower() == "true"
 
     if should_stream:
         # Streaming response - arun with stream=True returns an async generator directly
-        # Frontend expects cumulative content in each chunk (not deltas)
-        async def generate():
-            accumulated_content = ""
-            async for chunk in agent.arun(message, stream=True, session_id=session_id):
-                # Agno RunResponse objects have model_dump() for serialization
-                if hasattr(chunk, "model_dump"):
-                    chunk_data = chunk.model_dump(exclude_none=True)
-                    # Accumulate content for cumulative streaming
-                    if chunk_data.get("content"):
-                        accumulated_content += chunk_data["content"]
-                        chunk_data["content"] = accumulated_content
-                    # Map Agno event names to frontend expected names
-                    if chunk_data.get("event") == "RunResponse":
-                        chunk_data["event"] = "RunContent"
-                    yield json.dumps(chunk_data) + "\n"
-                elif hasattr(chunk, "content") and chunk.content:
-                    # Fallback for simple content - accumulate and use RunContent event
-                    accumulated_content += chunk.content
-                    yield json.dumps({
-                        "event": "RunContent",
-                        "content": accumulated_content,
-                        "content_type": "str",
-                        "created_at": 0,
-                    }) + "\n"
-            # Send completion event with full content
-            yield json.dumps({
-                "event": "RunCompleted",
-                "content": accumulated_content,
-                "content_type": "str",
-                "created_at": 0,
-            }) + "\n"
-
-        return StreamingResponse(generate(), media_type="text/event-stream")
+        # Frontend expects cumulative content in each chunk; cumulative=false sends deltas
+        return StreamingResponse(
+            _coalesce_stream(
+                _stream_run(agent, message, session_id, "RunContent", "RunCompleted", cumulative.lower() == "true"),
+                error_event=AGENT_RUN_ERROR_EVENT,
+            ),
+            media_type="text/event-stream",
+            headers=STREAM_HEADERS,
+        )
     else:
         # Non-streaming response
         run_response = await agent.arun(message, stream=False, session_id=session_id)
@@ -465,61 +749,35 @@ async def run_dynamic_team(
     message: str = Form(...),
     stream: str = Form(default="true"),
     session_id: str = Form(default=None),
+    cumulative: str = Form(default="true"),
 ):
     """Run a custom team dynamically.
 
     This endpoint creates teams on-the-fly for custom teams,
     enabling hot-loading without server restart.
     """
-    from agents import get_all_team_configs
-    from main import get_or_create_team
-
     # Check if team exists
     all_configs = get_all_team_configs()
     if team_id not in all_configs:
         raise HTTPException(status_code=404, detail=f"Team '{team_id}' not found")
 
     # Get or create the team
-    team = get_or_create_team(team_id)
+    team = _get_or_create_team(team_id)
 
     # Run the team
     should_stream = stream.lower() == "true"
 
     if should_stream:
         # Streaming response - arun with stream=True returns an async generator directly
-        # Frontend expects cumulative content in each chunk (not deltas)
-        async def generate():
-            accumulated_content = ""
-            async for chunk in team.arun(message, stream=True, session_id=session_id):
-                # Agno RunResponse objects have model_dump() for serialization
-                if hasattr(chunk, "model_dump"):
-                    chunk_data = chunk.model_dump(exclude_none=True)
-                    # Accumulate content for cumulative streaming
-                    if chunk_data.get("content"):
-                        accumulated_content += chunk_data["content"]
-                        chunk_data["content"] = accumulated_content
-                    # Map Agno event names to frontend expected names for teams
-                    if chunk_data.get("event") == "RunResponse":
-                        chunk_data["event"] = "TeamRunContent"
-                    yield json.dumps(chunk_data) + "\n"
-                elif hasattr(chunk, "content") and chunk.content:
-                    # Fallback for simple content - accumulate and use TeamRunContent event
-                    accumulated_content += chunk.content
-                    yield json.dumps({
-                        "event": "TeamRunContent",
-                        "content": accumulated_content,
-                        "content_type": "str",
-                        "created_at": 0,
-                    }) + "\n"
-            # Send completion event with full content
-            yield json.dumps({
-                "event": "TeamRunCompleted",
-                "content": accumulated_content,
-                "content_type": "str",
-                "created_at": 0,
-            }) + "\n"
-
-        return StreamingResponse(generate(), media_type="text/event-stream")
+        # Frontend expects cumulative content in each chunk; cumulative=false sends deltas
+        return StreamingResponse(
+            _coalesce_stream(
+                _stream_run(team, message, session_id, "TeamRunContent", "TeamRunCompleted", cumulative.lower() == "true"),
+                error_event=TEAM_RUN_ERROR_EVENT,
+            ),
+            media_type="text/event-stream",
+            headers=STREAM_HEADERS,
+        )
     else:
         run_response = await team.arun(message, stream=False, session_id=session_id)
         return {
@@ -4,16 +4,65 @@ Provides unified logging for the application and third-party libraries.
 Configures console output (INFO+) and rotating file logs (DEBUG+).
 """
 
+import atexit
+import copy
 import logging
+import queue
 import sys
-from pathlib import Path
+from logging.handlers import QueueHandler, QueueListener
 
 from loguru import logger
 
-# Log directory
-LOG_DIR = Path(__file__).parent.parent / "logs"
+from paths import LOG_DIR
+
 LOG_DIR.mkdir(exist_ok=True)
 
+# stdlib level name -> loguru level, filled on first use
+_LEVELS: dict[str, str | int] = {}
+
+# Listener thread feeding stdlib records to InterceptHandler, see setup_logging()
+_listener: QueueListener | None = None
+
+# Whether setup_logging() has registered its exit handlers yet
+_atexit_registered = False
+
+
+class _RecordQueueHandler(QueueHandler):
+    """QueueHandler that leaves formatting (and exc_info) to InterceptHandler.
+
+    The default prepare() formats the record with the stdlib formatter; only
+    the message arguments are merged here, so the caller does as little as possible.
+    Works on a copy, as other handlers may still see the caller's record.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def _stop_listener() -> None:
+    """Stop the current stdlib log listener, flushing its queue into loguru."""
+    if _listener is not None:
+        _listener.stop()
+
+
+def _patch_from_record(loguru_record: dict, record: logging.LogRecord) -> None:
+    """Take the call site and event time from the stdlib record.
+
+    Loguru stamps the time when the listener thread logs the record, which
+    under load can lag (and reorder against loguru-native records); the
+    stdlib record keeps when the event actually happened.
+    """
+    loguru_record.update(
+        name=record.name,
+        function=record.funcName,
+        line=record.lineno,
+        # Loguru's datetime subclass, so sink formats like {time:HH:mm:ss} still work
+        time=loguru_record["time"].fromtimestamp(record.created, loguru_record["time"].tzinfo),
+    )
+
 
 class InterceptHandler(logging.Handler):
     """Route stdlib logging to loguru for unified log handling.
@@ -21,22 +70,24 @@ class InterceptHandler(logging.Handler):
     Third-party libraries (Agno, FastAPI, uvicorn) use stdlib logging.
     This handler captures their logs and routes them through loguru
     for consistent formatting across all log sinks.
+
+    Runs on the QueueListener thread, so the call site and time are taken
+    from the record rather than from the current stack and clock.
     """
 
     def emit(self, record: logging.LogRecord) -> None:
-        # Get corresponding Loguru level
-        try:
-            level = logger.level(record.levelname).name
-        except ValueError:
-            level = record.levelno
+        # Get corresponding Loguru level (only a handful of distinct names)
+        level = _LEVELS.get(record.levelname)
+        if level is None:
+            try:
+                level = logger.level(record.levelname).name
+            except ValueError:
+                level = record.levelno
+            _LEVELS[record.levelname] = level
 
-        # Find caller from where originated the logged message
-        frame, depth = logging.currentframe(), 2
-        while frame and frame.f_code.co_filename == logging.__file__:
-            frame = frame.f_back
-            depth += 1
-
-        logger.opt(depth=depth, exception=record.exc_info).log(level, record.getMessage())
+        logger.patch(lambda r: _patch_from_record(r, record)).opt(exception=record.exc_info).log(
+            level, record.getMessage()
+        )
 
 
 def setup_logging() -> None:
@@ -44,8 +95,12 @@ def setup_logging() -> None:
 
     Sets up:
     - Console: INFO+ with colors
-    - File: DEBUG+ with rotation (10MB, 7 days retention)
+    - File: DEBUG+ with rotation (10MB, gzipped, 7 days retention)
     - Intercepts stdlib logging for third-party libraries
+
+    Both sinks are enqueued: callers only push the record onto a queue and a
+    background thread does the formatting and I/O, so logging from request
+    handlers never blocks the event loop on a terminal or disk write.
     """
     # Remove default handler
     logger.remove()
@@ -55,19 +110,44 @@ def setup_logging() -> None:
         sys.stderr,
         level="INFO",
         format="<green>{time:HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan> - <level>{message}</level>",
+        enqueue=True,
+        backtrace=False,
+        diagnose=False,
     )
 
-    # File: DEBUG and above, with rotation
+    # File: DEBUG and above, with rotation. Rotated files are gzipped; with
+    # enqueue both happen on the sink's worker thread, not the logging caller.
     logger.add(
         LOG_DIR / "agent.log",
         level="DEBUG",
         format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
         rotation="10 MB",
         retention="7 days",
+        compression="gz",
+        enqueue=True,
+        backtrace=False,
+        diagnose=False,
     )
 
-    # Route all stdlib logging to loguru (for third-party libs)
-    logging.basicConfig(handlers=[InterceptHandler()], level=0, force=True)
+    # Route all stdlib logging to loguru (for third-party libs). Callers only
+    # put the record on a queue; a listener thread hands it to InterceptHandler.
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, InterceptHandler(), respect_handler_level=False)
+    _listener.start()
+
+    # Registered once, however often this is called. Removing the sinks drains
+    # their queues, so buffered records are written on exit; atexit runs
+    # handlers in reverse, so the listener stops first and flushes into them.
+    global _atexit_registered
+    if not _atexit_registered:
+        atexit.register(logger.remove)
+        atexit.register(_stop_listener)
+        _atexit_registered = True
+
+    logging.basicConfig(handlers=[_RecordQueueHandler(log_queue)], level=0, force=True)
 
     # Set Agno loggers to DEBUG so their messages flow to loguru
     logging.getLogger("agno.agent.agent").setLevel(logging.DEBUG)
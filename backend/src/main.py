@@ -8,15 +8,24 @@ Uses AgentOS for unified agent management and AG-UI protocol support.
 Frontend: Use Agno's Agent UI (npx create-agent-ui@latest) connecting to port 7777.
 """
 
+import functools
+import os
 import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable, TypeVar
 
 from agno.agent.agent import Agent
 from agno.os import AgentOS
 from agno.os.interfaces.agui import AGUI
 from agno.team import Team
 from dotenv import load_dotenv
+from fastapi import FastAPI, Request
 from loguru import logger
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import HTMLResponse, Response
 
 # Ensure src directory is in path for uvicorn imports
 _src_dir = str(Path(__file__).parent)
@@ -37,7 +46,7 @@ from agents import (
     load_custom_teams,
 )
 from code_tools import AGENT_TOOLS, set_tool_registry
-from config_routes import router as config_router
+from config_routes import router as config_router, set_entity_factories
 from logging_config import setup_logging
 from tools import BUILTIN_TOOLS, ToolRegistry, load_agno_toolkit, register_toolkit
 
@@ -50,45 +59,71 @@ setup_logging()
 # Tool Registry Setup
 # ============================================================================
 
-registry = ToolRegistry()
-for name, (func, description) in BUILTIN_TOOLS.items():
-    registry.register(name, func, description)
+# Agno toolkits to expose in the interpreter: (name, tool prefix, label).
+# Gmail/Calendar require GOOGLE_CLIENT_ID, GOOGLE_CLIENT_SECRET, GOOGLE_PROJECT_ID.
+AGNO_TOOLKITS = (
+    ("hackernews", "hn_", "HackerNews"),
+    ("arxiv", "arxiv_", "arXiv"),
+    ("gmail", "gmail_", "Gmail"),
+    ("calendar", "cal_", "Calendar"),
+)
+
+
+@functools.lru_cache(maxsize=1)
+def build_tool_registry() -> tuple[ToolRegistry, str]:
+    """Build the interpreter tool registry once; returns it with its tool docs.
+
+    Also connects the registry to the code tools.
+    """
+    registry = ToolRegistry()
+    registry.register_many(
+        (name, func, description) for name, (func, description) in BUILTIN_TOOLS.items()
+    )
 
-# Load Agno toolkits (no credentials required)
-hackernews = load_agno_toolkit("hackernews")
-if hackernews:
-    registered = register_toolkit(registry, hackernews, prefix="hn_")
-    print(f"Loaded HackerNews tools: {registered}")
+    # Toolkit factories may import client libraries or refresh OAuth tokens, so
+    # run them concurrently; map() keeps the registration order stable
+    with ThreadPoolExecutor(max_workers=len(AGNO_TOOLKITS)) as executor:
+        toolkits = list(executor.map(load_agno_toolkit, (name for name, _, _ in AGNO_TOOLKITS)))
 
-arxiv = load_agno_toolkit("arxiv")
-if arxiv:
-    registered = register_toolkit(registry, arxiv, prefix="arxiv_")
-    print(f"Loaded arXiv tools: {registered}")
+    for (_, prefix, label), toolkit in zip(AGNO_TOOLKITS, toolkits, strict=True):
+        if toolkit:
+            registered = register_toolkit(registry, toolkit, prefix=prefix)
+            logger.info("Loaded {} tools: {}", label, registered)
 
-# Load Google toolkits (requires GOOGLE_CLIENT_ID, GOOGLE_CLIENT_SECRET, GOOGLE_PROJECT_ID)
-gmail = load_agno_toolkit("gmail")
-if gmail:
-    registered = register_toolkit(registry, gmail, prefix="gmail_")
-    print(f"Loaded Gmail tools: {registered}")
+    set_tool_registry(registry)
 
-calendar = load_agno_toolkit("calendar")
-if calendar:
-    registered = register_toolkit(registry, calendar, prefix="cal_")
-    print(f"Loaded Calendar tools: {registered}")
+    # Generate dynamic tool documentation for agent instructions
+    return registry, registry.generate_instructions()
 
-# Connect registry to code tools
-set_tool_registry(registry)
 
-# Generate dynamic tool documentation for agent instructions
-tool_docs = registry.generate_instructions()
+registry, tool_docs = build_tool_registry()
 
 # ============================================================================
 # Dynamic Agent/Team Cache
 # ============================================================================
 
-# Cache for dynamically created agents and teams
-_dynamic_agents: dict[str, Agent] = {}
-_dynamic_teams: dict[str, Team] = {}
+# Bounded LRU caches for dynamically created agents and teams. Creation runs
+# under the lock, so concurrent first requests for an ID build it only once.
+MAX_CACHED_ENTITIES = 128
+_dynamic_agents: OrderedDict[str, Agent] = OrderedDict()
+_dynamic_teams: OrderedDict[str, Team] = OrderedDict()
+_dynamic_lock = threading.Lock()
+
+T = TypeVar("T")
+
+
+def _get_or_create_cached(cache: OrderedDict, key: str, factory: Callable[[], T]) -> T:
+    """Return cache[key], creating it with factory() and evicting the oldest if full."""
+    with _dynamic_lock:
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+
+        value = factory()
+        cache[key] = value
+        if len(cache) > MAX_CACHED_ENTITIES:
+            cache.popitem(last=False)
+        return value
 
 
 def get_or_create_agent(agent_id: str) -> Agent:
@@ -98,29 +133,25 @@ def get_or_create_agent(agent_id: str) -> Agent:
     Built-in agents are created once and cached.
     Custom agents are created on first request and cached.
     """
-    # Check cache first
-    if agent_id in _dynamic_agents:
-        return _dynamic_agents[agent_id]
-
-    # Create the agent (works for both built-in and custom)
-    agent = create_agent(
-        agent_id=agent_id,
-        tools=AGENT_TOOLS,
-        tool_docs=tool_docs,
-        debug_mode=True,
+    return _get_or_create_cached(
+        _dynamic_agents,
+        agent_id,
+        lambda: create_agent(
+            agent_id=agent_id,
+            tools=AGENT_TOOLS,
+            tool_docs=tool_docs,
+            debug_mode=True,
+        ),
     )
-    _dynamic_agents[agent_id] = agent
-    return agent
 
 
 def get_or_create_team(team_id: str) -> Team:
     """Get a team by ID, creating it dynamically if needed."""
-    if team_id in _dynamic_teams:
-        return _dynamic_teams[team_id]
-
-    team = create_team(team_id, tools=AGENT_TOOLS, tool_docs=tool_docs)
-    _dynamic_teams[team_id] = team
-    return team
+    return _get_or_create_cached(
+        _dynamic_teams,
+        team_id,
+        lambda: create_team(team_id, tools=AGENT_TOOLS, tool_docs=tool_docs),
+    )
 
 
 def is_custom_agent(agent_id: str) -> bool:
@@ -137,30 +168,15 @@ def is_custom_team(team_id: str) -> bool:
 # Agent and Team Creation (for AgentOS initialization)
 # ============================================================================
 
-
-def get_agent(agent_id: str):
-    """Get or create an agent by ID."""
-    return create_agent(
-        agent_id=agent_id,
-        tools=AGENT_TOOLS,
-        tool_docs=tool_docs,
-        debug_mode=True,
-    )
-
-
-# Create agent instances for built-in agents only (custom loaded dynamically)
-agents = []
-for agent_id in AGENT_CONFIGS:
-    agent = get_agent(agent_id)
-    agents.append(agent)
-    _dynamic_agents[agent_id] = agent  # Cache using config ID
+# Create agent instances for built-in agents only (custom loaded dynamically).
+# Built through the dynamic cache so run endpoints reuse these same instances.
+agents = [get_or_create_agent(agent_id) for agent_id in AGENT_CONFIGS]
 
 # Create team instances
 teams = []
 for team_id in TEAM_CONFIGS:
-    team = create_team(team_id, tools=AGENT_TOOLS, tool_docs=tool_docs)
+    team = get_or_create_team(team_id)
     TEAMS[team_id] = team
-    _dynamic_teams[team_id] = team
     teams.append(team)
 
 # Create AGUI interfaces for all agents and teams
@@ -180,10 +196,87 @@ agent_os = AgentOS(
     interfaces=interfaces,
 )
 
+# Browsers cache CORS preflights for up to this long (Chromium caps it at 2 hours)
+CORS_PREFLIGHT_MAX_AGE = 7200
+
+
+def tune_cors_middleware(app: FastAPI) -> None:
+    """Adjust the CORS middleware AgentOS installs, before the first request builds it.
+
+    Origins become a frozenset so each Origin check is a hash lookup, and
+    preflights are cacheable for longer than Starlette's 10 minute default,
+    which saves the frontend most of its OPTIONS round-trips.
+    """
+    for middleware in app.user_middleware:
+        if middleware.cls is CORSMiddleware:
+            middleware.kwargs["allow_origins"] = frozenset(
+                middleware.kwargs.get("allow_origins", ())
+            )
+            middleware.kwargs["max_age"] = CORS_PREFLIGHT_MAX_AGE
+
+
+# Set PROFILING=1 to profile a request by adding ?profile=1 to its URL; the
+# response is then pyinstrument's HTML report instead of the endpoint's output
+PROFILING = os.getenv("PROFILING") == "1"
+
+
+def add_profiling_middleware(app: FastAPI) -> None:
+    """Profile requests that ask for it with pyinstrument (a dev dependency)."""
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        logger.warning("PROFILING is set but pyinstrument is not installed. Run: uv sync --dev")
+        return
+
+    @app.middleware("http")
+    async def profile_request(request: Request, call_next: Callable) -> Response:
+        if "profile" not in request.query_params:
+            return await call_next(request)
+
+        profiler = Profiler(async_mode="enabled")
+        profiler.start()
+        response = await call_next(request)
+        # Drain the body so streamed runs are profiled to completion
+        async for _ in response.body_iterator:
+            pass
+        profiler.stop()
+        return HTMLResponse(profiler.output_html())
+
+
+# Set OTEL_ENABLED=1 to trace requests with OpenTelemetry; spans are printed
+# to the console unless a tracer provider was already installed (e.g. by tests)
+OTEL_ENABLED = os.getenv("OTEL_ENABLED") == "1"
+
+
+def instrument_app(app: FastAPI) -> None:
+    """Create a span per request with OpenTelemetry (dev dependencies)."""
+    try:
+        from opentelemetry import trace
+        from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    except ImportError:
+        logger.warning("OTEL_ENABLED is set but OpenTelemetry is not installed. Run: uv sync --dev")
+        return
+
+    if not isinstance(trace.get_tracer_provider(), TracerProvider):
+        provider = TracerProvider()
+        provider.add_span_processor(BatchSpanProcessor(ConsoleSpanExporter()))
+        trace.set_tracer_provider(provider)
+    # Spans are named after the route template, so runs of different agents group together
+    FastAPIInstrumentor.instrument_app(app)
+
+
 # Get the FastAPI app from AgentOS
 app = agent_os.get_app()
+tune_cors_middleware(app)
+if PROFILING:
+    add_profiling_middleware(app)
+if OTEL_ENABLED:
+    instrument_app(app)
 
 # Add config routes for managing agents and teams
+set_entity_factories(get_or_create_agent, get_or_create_team)
 app.include_router(config_router)
 
 logger.info(f"AgentOS initialized with {len(agents)} agents and {len(teams)} teams")
@@ -0,0 +1,17 @@
+"""Filesystem locations used by the backend, computed once at import.
+
+The config, data and log directories can be moved with the
+AGENT_COMPOSER_CONFIG_DIR, AGENT_COMPOSER_DATA_DIR and AGENT_COMPOSER_LOG_DIR
+environment variables; the tests use them to keep off the checked-in files.
+"""
+
+import os
+from pathlib import Path
+
+SRC_DIR = Path(__file__).parent
+BACKEND_DIR = SRC_DIR.parent
+
+CONFIG_DIR = Path(os.getenv("AGENT_COMPOSER_CONFIG_DIR", BACKEND_DIR / "config"))
+DATA_DIR = Path(os.getenv("AGENT_COMPOSER_DATA_DIR", BACKEND_DIR / "data"))
+LOG_DIR = Path(os.getenv("AGENT_COMPOSER_LOG_DIR", BACKEND_DIR / "logs"))
+WORKSPACE_DIR = BACKEND_DIR / "workspace"
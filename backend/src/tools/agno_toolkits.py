@@ -4,7 +4,8 @@ These are native Python toolkits from the Agno framework that wrap various APIs.
 They require appropriate credentials to be set up (e.g., Google OAuth for Gmail/Calendar).
 """
 
-import functools
+import os
+from pathlib import Path
 from typing import TYPE_CHECKING, Any, Callable
 
 from agno.tools import Toolkit
@@ -48,15 +49,30 @@ def register_toolkit(registry: "ToolRegistry", toolkit: Toolkit, prefix: str = "
     Returns:
         List of registered tool names
     """
-    registered = []
-    functions = extract_toolkit_functions(toolkit)
+    tools = [
+        (f"{prefix}{name}", func, description)
+        for name, (func, description) in extract_toolkit_functions(toolkit).items()
+    ]
+    registry.register_many(tools)
+    return [name for name, _, _ in tools]
 
-    for name, (func, description) in functions.items():
-        tool_name = f"{prefix}{name}" if prefix else name
-        registry.register(tool_name, func, description)
-        registered.append(tool_name)
 
-    return registered
+# Environment variables agno's Google toolkits build an OAuth client config from
+GOOGLE_ENV_VARS = ("GOOGLE_CLIENT_ID", "GOOGLE_CLIENT_SECRET", "GOOGLE_PROJECT_ID")
+
+
+def _google_auth_configured(credentials_path: str | None, token_path: str) -> bool:
+    """Check whether a Google toolkit has anything to authenticate with.
+
+    Checked before importing the toolkit: the Google client libraries are slow
+    to import, and without a saved token, a credentials file or the
+    GOOGLE_* variables the toolkit could never authenticate anyway.
+    """
+    return (
+        Path(token_path).exists()
+        or Path(credentials_path or "credentials.json").exists()
+        or all(os.getenv(var) for var in GOOGLE_ENV_VARS)
+    )
 
 
 def create_gmail_tools(
@@ -75,14 +91,19 @@ def create_gmail_tools(
         token_path: Optional path to store/load OAuth token
 
     Returns:
-        GmailTools instance or None if dependencies not available
+        GmailTools instance or None if dependencies or credentials not available
     """
+    token_path = token_path or "gmail_token.json"
+    if not _google_auth_configured(credentials_path, token_path):
+        print("Gmail tools skipped: no Google credentials configured")
+        return None
+
     try:
         from agno.tools.gmail import GmailTools
 
         return GmailTools(
             credentials_path=credentials_path,
-            token_path=token_path or "gmail_token.json",
+            token_path=token_path,
         )
     except ImportError as e:
         print(f"Gmail tools not available: {e}")
@@ -110,14 +131,19 @@ def create_calendar_tools(
         allow_update: Whether to allow creating/updating/deleting events
 
     Returns:
-        GoogleCalendarTools instance or None if dependencies not available
+        GoogleCalendarTools instance or None if dependencies or credentials not available
     """
+    token_path = token_path or "calendar_token.json"
+    if not _google_auth_configured(credentials_path, token_path):
+        print("Google Calendar tools skipped: no Google credentials configured")
+        return None
+
     try:
         from agno.tools.googlecalendar import GoogleCalendarTools
 
         return GoogleCalendarTools(
             credentials_path=credentials_path,
-            token_path=token_path or "calendar_token.json",
+            token_path=token_path,
             allow_update=allow_update,
         )
     except ImportError as e:
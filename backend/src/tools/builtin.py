@@ -4,16 +4,66 @@ These tools are injected into the interpreter's namespace and can be
 called directly from executed Python code.
 """
 
-import json
+import contextlib
+import fnmatch
+import http.cookiejar
+import os
+import re
+import signal
 import subprocess
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
 from typing import Any
 
+import orjson
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 
-# Default workspace directory - can be overridden
-WORKSPACE_DIR = Path(__file__).parent.parent.parent / "workspace"
+from paths import WORKSPACE_DIR
+
+
+@lru_cache(maxsize=4)
+def _resolve_workspace(workspace: Path) -> Path:
+    """Resolve the workspace directory once per configured location."""
+    return workspace.resolve()
+
+
+# Elements stripped from HTML before extracting readable text
+NON_CONTENT_TAGS = ["script", "style", "nav", "footer", "header", "aside"]
+
+
+def _make_http_session() -> requests.Session:
+    """Create the session shared by the HTTP tools.
+
+    Repeat requests to a host reuse pooled keep-alive connections instead of
+    a new TCP/TLS handshake each. Cookies are never stored, so calls from
+    different agents and runs stay independent as with plain requests.get.
+    """
+    session = requests.Session()
+    session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_HTTP_SESSION = _make_http_session()
+
+# Worker threads for fetch_urls; sized to stay within the session's connection pool
+_FETCH_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="fetch-urls")
+
+
+# Recent web_search results, keyed by (normalized query, num_results), so an
+# agent repeating a search within a session doesn't hit DuckDuckGo again
+SEARCH_CACHE_SIZE = 256
+SEARCH_CACHE_TTL = 600  # seconds
+_search_cache: OrderedDict[tuple[str, int], tuple[float, str]] = OrderedDict()
+_search_cache_lock = threading.Lock()
 
 
 def web_search(query: str, num_results: int = 5) -> str:
@@ -26,6 +76,13 @@ def web_search(query: str, num_results: int = 5) -> str:
     Returns:
         JSON string of search results with title, url, snippet
     """
+    key = (" ".join(query.lower().split()), num_results)
+    with _search_cache_lock:
+        cached = _search_cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            _search_cache.move_to_end(key)
+            return cached[1]
+
     try:
         from ddgs import DDGS
 
@@ -33,11 +90,19 @@ def web_search(query: str, num_results: int = 5) -> str:
         with DDGS() as ddgs:
             for r in ddgs.text(query, max_results=num_results):
                 results.append({"title": r["title"], "url": r["href"], "snippet": r["body"]})
-        return json.dumps(results, indent=2)
+        output = orjson.dumps(results, option=orjson.OPT_INDENT_2).decode()
     except ImportError:
-        return json.dumps({"error": "ddgs not installed. Run: uv add ddgs"})
+        return orjson.dumps({"error": "ddgs not installed. Run: uv add ddgs"}).decode()
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return orjson.dumps({"error": str(e)}).decode()
+
+    # Only successful searches are cached; errors are retried on the next call
+    with _search_cache_lock:
+        _search_cache[key] = (time.monotonic() + SEARCH_CACHE_TTL, output)
+        _search_cache.move_to_end(key)
+        if len(_search_cache) > SEARCH_CACHE_SIZE:
+            _search_cache.popitem(last=False)
+    return output
 
 
 def fetch_url(url: str, extract_text: bool = True) -> str:
@@ -51,23 +116,70 @@ def fetch_url(url: str, extract_text: bool = True) -> str:
         Page content as text
     """
     try:
-        response = requests.get(url, timeout=30, headers={"User-Agent": "Mozilla/5.0"})
+        response = _HTTP_SESSION.get(url, timeout=30, headers={"User-Agent": "Mozilla/5.0"})
         response.raise_for_status()
 
         content_type = response.headers.get("content-type", "")
 
         if extract_text and "text/html" in content_type:
-            soup = BeautifulSoup(response.text, "html.parser")
+            # Imported on first use; nothing else loads bs4 at startup
+            from bs4 import BeautifulSoup
+
+            # lxml is a C parser; passing bytes lets it honour the page's own
+            # charset unless the server declared one
+            declared = response.encoding if "charset" in content_type else None
+            soup = BeautifulSoup(response.content, "lxml", from_encoding=declared)
             # Remove non-content elements
-            for element in soup(["script", "style", "nav", "footer", "header", "aside"]):
+            for element in soup(NON_CONTENT_TAGS):
                 element.decompose()
             return soup.get_text(separator="\n", strip=True)
 
+        # Without a declared charset requests would run charset detection over
+        # the whole body; assume UTF-8 instead (undecodable bytes are replaced)
+        if response.encoding is None:
+            response.encoding = "utf-8"
         return response.text
     except Exception as e:
         return f"Error fetching URL: {e}"
 
 
+def fetch_urls(urls: list[str], extract_text: bool = True) -> str:
+    """Fetch several URLs concurrently.
+
+    Args:
+        urls: The URLs to fetch
+        extract_text: If True, extract readable text from HTML (default True)
+
+    Returns:
+        JSON string mapping each URL to its content or error message
+    """
+    pages = _FETCH_EXECUTOR.map(partial(fetch_url, extract_text=extract_text), urls)
+    return orjson.dumps(dict(zip(urls, pages, strict=True)), option=orjson.OPT_INDENT_2).decode()
+
+
+# shell() keeps only the last this-many lines of each stream
+SHELL_MAX_LINES = 2000
+
+
+def _tail_lines(stream: Any, lines: deque[str], dropped: list[bool]) -> None:
+    """Read a text pipe to EOF into a bounded deque, noting if lines fell off."""
+    with stream:
+        for line in stream:
+            if len(lines) == lines.maxlen:
+                dropped[0] = True
+            lines.append(line)
+
+
+def _kill_process_group(proc: subprocess.Popen) -> None:
+    """Kill a process started with start_new_session, and any children it left."""
+    if sys.platform == "win32":
+        proc.kill()
+    else:
+        with contextlib.suppress(ProcessLookupError):
+            os.killpg(proc.pid, signal.SIGKILL)
+    proc.wait()
+
+
 def shell(command: str, cwd: str | None = None, timeout: int = 30) -> str:
     """Run a shell command.
 
@@ -81,24 +193,53 @@ def shell(command: str, cwd: str | None = None, timeout: int = 30) -> str:
     """
     try:
         work_dir = Path(cwd) if cwd else WORKSPACE_DIR
-        result = subprocess.run(
+        proc = subprocess.Popen(
             command,
             shell=True,  # noqa: S602 - Intentional for interpreter tool
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             text=True,
+            errors="replace",
             cwd=str(work_dir),
-            timeout=timeout,
+            # Own process group, so a timeout also kills background children
+            start_new_session=True,
         )
 
-        output = result.stdout
-        if result.stderr:
-            output += f"\n\nSTDERR:\n{result.stderr}"
-        if result.returncode != 0:
-            output += f"\n\nExit code: {result.returncode}"
+        # Both pipes are drained as the command runs, keeping only their last
+        # SHELL_MAX_LINES lines, so a chatty command can't fill memory
+        tails: list[tuple[deque[str], list[bool]]] = []
+        readers = []
+        for stream in (proc.stdout, proc.stderr):
+            tail: tuple[deque[str], list[bool]] = (deque(maxlen=SHELL_MAX_LINES), [False])
+            reader = threading.Thread(target=_tail_lines, args=(stream, *tail), daemon=True)
+            reader.start()
+            tails.append(tail)
+            readers.append(reader)
+
+        # Background children can hold the pipes open after the shell exits,
+        # so the readers are joined against the same deadline
+        deadline = time.monotonic() + timeout
+        try:
+            returncode = proc.wait(timeout=timeout)
+            for reader in readers:
+                reader.join(max(0.0, deadline - time.monotonic()))
+            if any(reader.is_alive() for reader in readers):
+                raise subprocess.TimeoutExpired(command, timeout)
+        except subprocess.TimeoutExpired:
+            _kill_process_group(proc)
+            return f"Command timed out after {timeout} seconds"
+
+        stdout, stderr = (
+            ("[earlier output truncated]\n" if dropped[0] else "") + "".join(lines)
+            for lines, dropped in tails
+        )
+        output = stdout
+        if stderr:
+            output += f"\n\nSTDERR:\n{stderr}"
+        if returncode != 0:
+            output += f"\n\nExit code: {returncode}"
 
         return output if output.strip() else "(no output)"
-    except subprocess.TimeoutExpired:
-        return f"Command timed out after {timeout} seconds"
     except Exception as e:
         return f"Error running command: {e}"
 
@@ -114,17 +255,17 @@ def http_get(url: str, headers: dict[str, str] | None = None) -> str:
         JSON string with status, headers, and body
     """
     try:
-        response = requests.get(url, headers=headers, timeout=30)
-        return json.dumps(
+        response = _HTTP_SESSION.get(url, headers=headers, timeout=30)
+        return orjson.dumps(
             {
                 "status": response.status_code,
                 "headers": dict(response.headers),
                 "body": response.text[:10000],  # Limit body size
             },
-            indent=2,
-        )
+            option=orjson.OPT_INDENT_2,
+        ).decode()
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return orjson.dumps({"error": str(e)}).decode()
 
 
 def http_post(url: str, data: Any = None, json_data: dict | None = None, headers: dict[str, str] | None = None) -> str:
@@ -140,17 +281,17 @@ def http_post(url: str, data: Any = None, json_data: dict | None = None, headers
         JSON string with status, headers, and body
     """
     try:
-        response = requests.post(url, data=data, json=json_data, headers=headers, timeout=30)
-        return json.dumps(
+        response = _HTTP_SESSION.post(url, data=data, json=json_data, headers=headers, timeout=30)
+        return orjson.dumps(
             {
                 "status": response.status_code,
                 "headers": dict(response.headers),
                 "body": response.text[:10000],  # Limit body size
             },
-            indent=2,
-        )
+            option=orjson.OPT_INDENT_2,
+        ).decode()
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return orjson.dumps({"error": str(e)}).decode()
 
 
 def read_workspace_file(path: str) -> str:
@@ -165,7 +306,7 @@ def read_workspace_file(path: str) -> str:
     try:
         # Resolve the path and ensure it's within workspace (prevent path traversal)
         file_path = (WORKSPACE_DIR / path).resolve()
-        workspace_resolved = WORKSPACE_DIR.resolve()
+        workspace_resolved = _resolve_workspace(WORKSPACE_DIR)
 
         if not file_path.is_relative_to(workspace_resolved):
             return f"Error: Path '{path}' is outside the workspace directory"
@@ -191,7 +332,7 @@ def write_workspace_file(path: str, content: str) -> str:
     try:
         # Resolve the path and ensure it's within workspace (prevent path traversal)
         file_path = (WORKSPACE_DIR / path).resolve()
-        workspace_resolved = WORKSPACE_DIR.resolve()
+        workspace_resolved = _resolve_workspace(WORKSPACE_DIR)
 
         if not file_path.is_relative_to(workspace_resolved):
             return f"Error: Path '{path}' is outside the workspace directory"
@@ -205,6 +346,12 @@ def write_workspace_file(path: str, content: str) -> str:
         return f"Error writing file: {e}"
 
 
+@lru_cache(maxsize=64)
+def _compile_name_pattern(pattern: str) -> re.Pattern[str]:
+    """Compile a single-component glob pattern to a regex matching entry names."""
+    return re.compile(fnmatch.translate(pattern))
+
+
 def list_workspace_files(pattern: str = "*") -> str:
     """List files in the workspace.
 
@@ -215,10 +362,17 @@ def list_workspace_files(pattern: str = "*") -> str:
         Newline-separated list of file paths
     """
     try:
-        files = list(WORKSPACE_DIR.glob(pattern))
+        if "/" in pattern or "**" in pattern:
+            files = [str(f.relative_to(WORKSPACE_DIR)) for f in WORKSPACE_DIR.glob(pattern)]
+        else:
+            # Patterns without a directory part (like the default) only match
+            # top-level names: one scandir pass, no Path per entry
+            match = _compile_name_pattern(pattern).match
+            with os.scandir(WORKSPACE_DIR) as entries:
+                files = [entry.name for entry in entries if match(entry.name)]
         if not files:
             return f"No files matching '{pattern}' in workspace"
-        return "\n".join(str(f.relative_to(WORKSPACE_DIR)) for f in sorted(files))
+        return "\n".join(sorted(files))
     except Exception as e:
         return f"Error listing files: {e}"
 
@@ -227,6 +381,10 @@ def list_workspace_files(pattern: str = "*") -> str:
 BUILTIN_TOOLS = {
     "web_search": (web_search, "Search the web using DuckDuckGo"),
     "fetch_url": (fetch_url, "Fetch content from a URL, optionally extracting text from HTML"),
+    "fetch_urls": (
+        fetch_urls,
+        "Fetch several URLs concurrently, optionally extracting text from HTML",
+    ),
     "shell": (shell, "Run a shell command"),
     "http_get": (http_get, "Make an HTTP GET request"),
     "http_post": (http_post, "Make an HTTP POST request"),
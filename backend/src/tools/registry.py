@@ -1,11 +1,22 @@
 """Tool registry for managing interpreter-callable tools."""
 
 import inspect
+import threading
 from dataclasses import dataclass, field
-from typing import Any, Callable
+from typing import Any, Callable, Iterable
 
+# Python annotation -> JSON schema type for extracted tool parameters
+JSON_TYPES = {
+    str: "string",
+    int: "integer",
+    float: "number",
+    bool: "boolean",
+    list: "array",
+    dict: "object",
+}
 
-@dataclass
+
+@dataclass(slots=True)
 class ToolDefinition:
     """Definition of a tool that can be called from the Python interpreter."""
 
@@ -13,6 +24,49 @@ class ToolDefinition:
     func: Callable
     description: str
     parameters: dict = field(default_factory=dict)
+    # Markdown block for generate_instructions, rendered once at registration
+    rendered_md: str = ""
+
+    def __post_init__(self) -> None:
+        if not self.rendered_md:
+            self.rendered_md = _render_tool_markdown(self)
+
+
+# Heading for generate_instructions, followed by one block per tool
+INSTRUCTIONS_HEADER = "\n".join(
+    [
+        "## Available Python Tools",
+        "",
+        "These functions are available in the Python interpreter.",
+        "Call them directly in your code (no imports needed):",
+        "",
+    ]
+)
+
+
+def _render_tool_markdown(tool: ToolDefinition) -> str:
+    """Render one tool's section of the generated instructions."""
+    lines = [f"### `{tool.name}`", f"{tool.description}", ""]
+
+    props = tool.parameters.get("properties", {})
+    required = tool.parameters.get("required", [])
+
+    if props:
+        lines.append("**Parameters:**")
+        for param_name, param_info in props.items():
+            param_type = param_info.get("type", "any")
+            default = param_info.get("default")
+            is_required = param_name in required
+
+            if is_required:
+                lines.append(f"- `{param_name}` ({param_type}, required)")
+            elif default is not None:
+                lines.append(f"- `{param_name}` ({param_type}, default={default!r})")
+            else:
+                lines.append(f"- `{param_name}` ({param_type}, optional)")
+        lines.append("")
+
+    return "\n".join(lines)
 
 
 class ToolRegistry:
@@ -30,7 +84,15 @@ class ToolRegistry:
     """
 
     def __init__(self) -> None:
+        # Copy-on-write: register() swaps in a new dict under _lock, so readers
+        # (interpreter calls on worker threads) iterate a stable snapshot
+        # without locking and never see it change size mid-iteration.
         self._tools: dict[str, ToolDefinition] = {}
+        self._lock = threading.Lock()
+        # Bumped on every registration so callers can cache derived views
+        self.version = 0
+        # (version, markdown) from the last generate_instructions() call
+        self._cached_md: tuple[int, str] | None = None
 
     def register(
         self,
@@ -49,7 +111,25 @@ class ToolRegistry:
         """
         if parameters is None:
             parameters = self._extract_parameters(func)
-        self._tools[name] = ToolDefinition(name, func, description, parameters)
+        definition = ToolDefinition(name, func, description, parameters)
+        with self._lock:
+            self._tools = {**self._tools, name: definition}
+            self.version += 1
+
+    def register_many(self, tools: Iterable[tuple[str, Callable, str]]) -> None:
+        """Register several tools with a single table copy and version bump.
+
+        Args:
+            tools: (name, func, description) triples; parameters are extracted
+                from each function's signature
+        """
+        definitions = {
+            name: ToolDefinition(name, func, description, self._extract_parameters(func))
+            for name, func, description in tools
+        }
+        with self._lock:
+            self._tools = {**self._tools, **definitions}
+            self.version += 1
 
     def _extract_parameters(self, func: Callable) -> dict:
         """Extract parameter info from function signature."""
@@ -57,15 +137,6 @@ class ToolRegistry:
         properties = {}
         required = []
 
-        type_map = {
-            str: "string",
-            int: "integer",
-            float: "number",
-            bool: "boolean",
-            list: "array",
-            dict: "object",
-        }
-
         for param_name, param in sig.parameters.items():
             if param_name in ("self", "cls"):
                 continue
@@ -75,13 +146,15 @@ class ToolRegistry:
             # Get type annotation
             if param.annotation != inspect.Parameter.empty:
                 py_type = param.annotation
-                # Handle Optional types
+                # Handle Optional types; parametrized containers keep their origin
                 if hasattr(py_type, "__origin__"):
-                    if py_type.__origin__ is type(None):
+                    if py_type.__origin__ in JSON_TYPES:
+                        py_type = py_type.__origin__
+                    elif py_type.__origin__ is type(None):
                         py_type = str
                     else:
                         py_type = py_type.__args__[0] if py_type.__args__ else str
-                param_info["type"] = type_map.get(py_type, "string")
+                param_info["type"] = JSON_TYPES.get(py_type, "string")
             else:
                 param_info["type"] = "string"
 
@@ -109,41 +182,20 @@ class ToolRegistry:
         Returns:
             Formatted markdown string documenting all registered tools
         """
-        if not self._tools:
-            return ""
-
-        lines = [
-            "## Available Python Tools",
-            "",
-            "These functions are available in the Python interpreter.",
-            "Call them directly in your code (no imports needed):",
-            "",
-        ]
-
-        for name, tool in self._tools.items():
-            lines.append(f"### `{name}`")
-            lines.append(f"{tool.description}")
-            lines.append("")
-
-            props = tool.parameters.get("properties", {})
-            required = tool.parameters.get("required", [])
-
-            if props:
-                lines.append("**Parameters:**")
-                for param_name, param_info in props.items():
-                    param_type = param_info.get("type", "any")
-                    default = param_info.get("default")
-                    is_required = param_name in required
-
-                    if is_required:
-                        lines.append(f"- `{param_name}` ({param_type}, required)")
-                    elif default is not None:
-                        lines.append(f"- `{param_name}` ({param_type}, default={default!r})")
-                    else:
-                        lines.append(f"- `{param_name}` ({param_type}, optional)")
-                lines.append("")
-
-        return "\n".join(lines)
+        cached = self._cached_md
+        version = self.version
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        tools = self._tools
+        if not tools:
+            markdown = ""
+        else:
+            markdown = "\n".join(
+                [INSTRUCTIONS_HEADER, *(tool.rendered_md for tool in tools.values())]
+            )
+        self._cached_md = (version, markdown)
+        return markdown
 
     def list_tools(self) -> list[str]:
         """Return list of registered tool names."""
@@ -0,0 +1,264 @@
+"""Shared fixtures for the API tests."""
+
+import asyncio
+import contextlib
+import os
+import shutil
+import time
+from collections.abc import AsyncIterator, Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient, Request, Response
+
+# The app and agno's model SDKs are imported inside the fixtures that need
+# them, so collection (and each xdist worker's startup) stays cheap
+if TYPE_CHECKING:
+    from agno.models.response import ModelResponse
+
+# HTML profiles of tests marked `profile`, written when run with PROFILING=1
+PROFILE_DIR = Path(__file__).parent.parent / "profiles"
+
+# Name of the running `profile`-marked test, while PROFILING is enabled
+_profiled_test: str | None = None
+
+
+async def _request_profile(request: Request) -> None:
+    if _profiled_test is not None:
+        request.url = request.url.copy_add_param("profile", "1")
+
+
+async def _save_profile(response: Response) -> None:
+    if _profiled_test is not None and "profile" in response.request.url.params:
+        await response.aread()
+        PROFILE_DIR.mkdir(exist_ok=True)
+        (PROFILE_DIR / f"{_profiled_test}.html").write_bytes(response.content)
+
+
+@pytest.fixture(autouse=True)
+def _profile_marked_test(request):
+    """Profile the requests of tests marked `profile` when PROFILING=1."""
+    global _profiled_test
+    if not request.node.get_closest_marker("profile"):
+        yield
+        return
+    from src.main import PROFILING
+
+    if not PROFILING:
+        yield
+        return
+    _profiled_test = request.node.name
+    try:
+        yield
+    finally:
+        _profiled_test = None
+
+
+# With OTEL_ENABLED=1 the app traces each request; spans are printed and, if
+# OTEL_SPAN_BUDGET_MS is set, any test during which a span ran longer fails
+OTEL_ENABLED = os.getenv("OTEL_ENABLED") == "1"
+SPAN_BUDGET_MS = float(os.getenv("OTEL_SPAN_BUDGET_MS", "0"))
+
+# Spans over SPAN_BUDGET_MS since the current test started
+_slow_spans: list[str] = []
+
+
+def _install_tracing() -> None:
+    """Install a tracer provider for the app that exports to the console."""
+    from opentelemetry import trace
+    from opentelemetry.sdk.trace import ReadableSpan, SpanProcessor, TracerProvider
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter, SimpleSpanProcessor
+
+    class SpanBudgetProcessor(SpanProcessor):
+        def on_end(self, span: ReadableSpan) -> None:
+            duration_ms = (span.end_time - span.start_time) / 1e6
+            if duration_ms > SPAN_BUDGET_MS:
+                _slow_spans.append(f"{span.name} took {duration_ms:.0f} ms")
+
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(ConsoleSpanExporter()))
+    if SPAN_BUDGET_MS:
+        provider.add_span_processor(SpanBudgetProcessor())
+    trace.set_tracer_provider(provider)
+
+
+@pytest.fixture(autouse=True)
+def _check_span_budget():
+    """Fail a test if a request span exceeded OTEL_SPAN_BUDGET_MS while it ran."""
+    _slow_spans.clear()
+    yield
+    if _slow_spans:
+        pytest.fail("Spans over the budget: " + "; ".join(_slow_spans))
+
+
+# Checked-in backend config, copied into each test session's own directory
+CONFIG_DIR = Path(__file__).parent.parent / "config"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _isolated_state(tmp_path_factory):
+    """Point the app's config, database and logs at a per-session temp directory.
+
+    Set before the app is imported (src/paths.py reads these once). Each xdist
+    worker is its own session, so parallel workers never share the config
+    files or the SQLite database, and the checked-in ones are left untouched.
+    """
+    root = tmp_path_factory.mktemp("state")
+    shutil.copytree(CONFIG_DIR, root / "config")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("AGENT_COMPOSER_CONFIG_DIR", str(root / "config"))
+        monkeypatch.setenv("AGENT_COMPOSER_DATA_DIR", str(root / "data"))
+        monkeypatch.setenv("AGENT_COMPOSER_LOG_DIR", str(root / "logs"))
+        yield root
+
+
+@pytest.fixture(scope="session")
+def app(_isolated_state):
+    """The AgentOS app, imported on first use rather than at collection."""
+    if OTEL_ENABLED:
+        # Installed before the app is built, so main.py keeps this provider
+        _install_tracing()
+    from src.main import app
+
+    return app
+
+
+@pytest_asyncio.fixture(scope="session")
+async def client(app):
+    """One AsyncClient over the ASGI app, reused by every test in the session."""
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test",
+        timeout=60.0,
+        event_hooks={"request": [_request_profile], "response": [_save_profile]},
+    ) as client:
+        await _warm_up(client)
+        yield client
+
+
+@pytest_asyncio.fixture(scope="session")
+async def agents(client):
+    """The /agents listing, fetched once; AgentOS serves a fixed set of agents."""
+    response = await client.get("/agents")
+    return response.json()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def first_agent_id(agents):
+    """ID of the first listed agent, for tests that just need any agent."""
+    return agents[0]["id"]
+
+
+# Canned reply from the fake model used by the default (non-integration) runs
+FAKE_REPLY = "Hello from test"
+
+
+def _fake_response() -> "ModelResponse":
+    from agno.models.response import ModelResponse
+
+    return ModelResponse(role="assistant", content=FAKE_REPLY)
+
+
+def _fake_invoke(self, *args, **kwargs) -> "ModelResponse":
+    return _fake_response()
+
+
+async def _fake_ainvoke(self, *args, **kwargs) -> "ModelResponse":
+    return _fake_response()
+
+
+def _fake_invoke_stream(self, *args, **kwargs) -> "Iterator[ModelResponse]":
+    yield _fake_response()
+
+
+async def _fake_ainvoke_stream(self, *args, **kwargs) -> "AsyncIterator[ModelResponse]":
+    yield _fake_response()
+
+
+def _use_fake_model(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Patch the OpenRouter provider calls to return FAKE_REPLY."""
+    from agno.models.openrouter import OpenRouter
+
+    monkeypatch.setattr(OpenRouter, "invoke", _fake_invoke)
+    monkeypatch.setattr(OpenRouter, "ainvoke", _fake_ainvoke)
+    monkeypatch.setattr(OpenRouter, "invoke_stream", _fake_invoke_stream)
+    monkeypatch.setattr(OpenRouter, "ainvoke_stream", _fake_ainvoke_stream)
+
+
+async def _warm_up(client: AsyncClient) -> None:
+    """Pay the app's first-request and first-run setup before any test is timed.
+
+    Failures are ignored here; the tests that exercise these paths report them.
+    """
+    with pytest.MonkeyPatch.context() as monkeypatch, contextlib.suppress(Exception):
+        _use_fake_model(monkeypatch)
+        await client.get("/health")
+        await client.post(
+            "/config/agents/general/runs",
+            data={"message": "ping", "stream": "false"},
+        )
+
+
+@pytest.fixture(params=["fake", pytest.param("real", marks=pytest.mark.integration)])
+def llm(request, monkeypatch):
+    """Model backend for tests that run agents.
+
+    The "fake" variant patches the OpenRouter provider calls to return
+    FAKE_REPLY, so the test covers the HTTP and routing layers without a
+    model; the "real" variant is marked integration and only runs with
+    `-m integration` (needs OPENROUTER_API_KEY).
+    """
+    if request.param == "fake":
+        _use_fake_model(monkeypatch)
+    return request.param
+
+
+@pytest.fixture
+def expected_reply(llm):
+    """The reply a run should return: FAKE_REPLY for the fake model, None for the real one."""
+    return FAKE_REPLY if llm == "fake" else None
+
+
+# Latency of the slow_llm fake; long enough to tell overlapping runs from serialized ones
+SLOW_LLM_DELAY = 0.5
+
+
+@pytest.fixture
+def slow_llm(monkeypatch):
+    """Fake model whose async calls take SLOW_LLM_DELAY seconds without blocking the loop.
+
+    Returns the (start, end) perf_counter times of its calls, in completion order.
+    """
+
+    from agno.models.openrouter import OpenRouter
+
+    calls: list[tuple[float, float]] = []
+
+    async def slow_ainvoke(self, *args, **kwargs) -> "ModelResponse":
+        start = time.perf_counter()
+        await asyncio.sleep(SLOW_LLM_DELAY)
+        calls.append((start, time.perf_counter()))
+        return _fake_response()
+
+    monkeypatch.setattr(OpenRouter, "ainvoke", slow_ainvoke)
+    return calls
+
+
+@pytest.fixture
+def chunked_llm(monkeypatch):
+    """Fake model that streams FAKE_REPLY word by word; returns the chunks."""
+    from agno.models.openrouter import OpenRouter
+
+    chunks = FAKE_REPLY.split(" ")
+    chunks = [chunk + " " for chunk in chunks[:-1]] + chunks[-1:]
+
+    async def chunked_ainvoke_stream(self, *args, **kwargs) -> "AsyncIterator[ModelResponse]":
+        from agno.models.response import ModelResponse
+
+        for chunk in chunks:
+            yield ModelResponse(role="assistant", content=chunk)
+
+    monkeypatch.setattr(OpenRouter, "ainvoke_stream", chunked_ainvoke_stream)
+    return chunks
@@ -1,293 +1,272 @@
 """Tests for the Agno AgentOS API endpoints."""
 
-import pytest
-from httpx import ASGITransport, AsyncClient
-
-from src.main import app
+import asyncio
+import uuid
 
+import orjson
+import pytest
+import pytest_asyncio
 
-@pytest.mark.asyncio
-async def test_agents_list_endpoint():
-    """Test that the /agents endpoint returns the list of available agents."""
-    transport = ASGITransport(app=app)
-    async with AsyncClient(
-        transport=transport, base_url="http://test", timeout=10.0
-    ) as client:
-        response = await client.get("/agents")
-        assert response.status_code == 200
-
-        agents = response.json()
-        # At minimum, general and coding should be present (may have custom agents too)
-        assert len(agents) >= 2
+# (path, minimum number of items, IDs that must be listed, fields every item has).
+# AgentOS lists may also hold custom agents/teams; Agno's /agents items have no
+# top-level 'name', while the /config views add 'name' and a 'builtin' flag.
+LIST_ENDPOINTS = [
+    ("/agents", 2, set(), {"id"}),
+    ("/teams", 1, {"research"}, {"id"}),
+    ("/config/all-agents", 2, {"general", "coding"}, {"id", "name", "builtin"}),
+    ("/config/all-teams", 1, {"research"}, {"id", "name", "builtin"}),
+]
 
-        # Check structure - Agno returns these fields
-        for agent in agents:
-            assert "id" in agent
-            # Note: Agno doesn't return 'name' at top level, but agent data is present
+# Seconds the fake model's stream may take to produce its first content event
+FIRST_EVENT_TIMEOUT = 5
 
 
 @pytest.mark.asyncio
-async def test_teams_list_endpoint():
-    """Test that the /teams endpoint returns the list of available teams."""
-    transport = ASGITransport(app=app)
-    async with AsyncClient(
-        transport=transport, base_url="http://test", timeout=10.0
-    ) as client:
-        response = await client.get("/teams")
-        assert response.status_code == 200
+@pytest.mark.parametrize("path,min_count,required_ids,required_fields", LIST_ENDPOINTS)
+async def test_list_endpoint(client, path, min_count, required_ids, required_fields):
+    """Test that a list endpoint returns the built-in entries with the expected fields."""
+    response = await client.get(path)
+    assert response.status_code == 200
 
-        teams = response.json()
-        # At minimum, the research team should be present (may have custom teams too)
-        assert len(teams) >= 1
-        team_ids = [t["id"] for t in teams]
-        assert "research" in team_ids  # Built-in research team must exist
+    items = response.json()
+    assert len(items) >= min_count
+    assert required_ids <= {item["id"] for item in items}
 
-        # Check structure
-        for team in teams:
-            assert "id" in team
+    # Check structure
+    for item in items:
+        assert required_fields <= item.keys()
 
 
 @pytest.mark.asyncio
-async def test_agent_detail_endpoint():
+async def test_agent_detail_endpoint(client, agents):
     """Test that individual agent details are accessible."""
-    transport = ASGITransport(app=app)
-    async with AsyncClient(
-        transport=transport, base_url="http://test", timeout=10.0
-    ) as client:
-        # First get the list to find agent IDs
-        response = await client.get("/agents")
-        agents = response.json()
-
-        # Check each agent is accessible by ID
-        for agent in agents:
-            agent_id = agent["id"]
-            response = await client.get(f"/agents/{agent_id}")
-            assert response.status_code == 200
-            detail = response.json()
-            assert detail["id"] == agent_id
+    # Check each agent is accessible by ID (requests issued concurrently)
+    responses = await asyncio.gather(*(client.get(f"/agents/{agent['id']}") for agent in agents))
+    for agent, response in zip(agents, responses, strict=True):
+        assert response.status_code == 200
+        detail = response.json()
+        assert detail["id"] == agent["id"]
 
 
 @pytest.mark.asyncio
-async def test_agent_runs_endpoint():
+async def test_agent_runs_endpoint(client, first_agent_id, expected_reply):
     """Test that the agent runs endpoint accepts requests and returns response."""
-    transport = ASGITransport(app=app)
-    async with AsyncClient(
-        transport=transport, base_url="http://test", timeout=60.0
-    ) as client:
-        # Get agent ID first
-        response = await client.get("/agents")
-        agents = response.json()
-        agent_id = agents[0]["id"]
-
-        # AgentOS uses multipart/form-data with 'message' field
-        response = await client.post(
-            f"/agents/{agent_id}/runs",
-            data={"message": "Say hello", "stream": "false"},
-        )
-        assert response.status_code == 200
+    # AgentOS uses multipart/form-data with 'message' field
+    response = await client.post(
+        f"/agents/{first_agent_id}/runs",
+        data={"message": "Say hello", "stream": "false"},
+    )
+    assert response.status_code == 200
+    if expected_reply is not None:
+        assert response.json()["content"] == expected_reply
 
 
 @pytest.mark.asyncio
-async def test_agent_runs_streaming():
+@pytest.mark.profile
+async def test_agent_runs_streaming(client, first_agent_id, llm, expected_reply):
     """Test that streaming mode returns SSE events."""
-    transport = ASGITransport(app=app)
-    async with AsyncClient(
-        transport=transport, base_url="http://test", timeout=60.0
-    ) as client:
-        # Get agent ID first
-        response = await client.get("/agents")
-        agents = response.json()
-        agent_id = agents[0]["id"]
-
-        # Request with streaming enabled
-        response = await client.post(
-            f"/agents/{agent_id}/runs",
+
+    async def first_content_event() -> tuple[str, dict]:
+        # Request with streaming enabled; stop reading at the first content event
+        async with client.stream(
+            "POST",
+            f"/agents/{first_agent_id}/runs",
             data={"message": "Say hello", "stream": "true"},
-        )
-        assert response.status_code == 200
-        # Streaming response should have text/event-stream content type
-        content_type = response.headers.get("content-type", "")
-        assert "text/event-stream" in content_type or len(response.text) > 0
+        ) as response:
+            assert response.status_code == 200
+            content_type = response.headers.get("content-type", "")
+            async for line in response.aiter_lines():
+                if line.startswith("data: "):
+                    event = orjson.loads(line.removeprefix("data: "))
+                    if event["event"] == "RunContent":
+                        return content_type, event
+        return content_type, {}
+
+    # A slow first event fails fast; the real model gets the client's full timeout
+    timeout = FIRST_EVENT_TIMEOUT if llm == "fake" else None
+    content_type, event = await asyncio.wait_for(first_content_event(), timeout)
+    # Streaming response should have text/event-stream content type
+    assert "text/event-stream" in content_type
+    assert event
+    if expected_reply is not None:
+        assert event["content"] == expected_reply
 
 
 @pytest.mark.asyncio
-async def test_agent_runs_validates_request():
+async def test_agent_runs_validates_request(client, first_agent_id):
     """Test that the runs endpoint validates the request body."""
-    transport = ASGITransport(app=app)
-    async with AsyncClient(
-        transport=transport, base_url="http://test", timeout=10.0
-    ) as client:
-        # Get agent ID first
-        response = await client.get("/agents")
-        agents = response.json()
-        agent_id = agents[0]["id"]
-
-        # Missing required 'message' field
-        response = await client.post(f"/agents/{agent_id}/runs", data={})
-        assert response.status_code == 422  # Unprocessable Entity
+    # Missing required 'message' field
+    response = await client.post(f"/agents/{first_agent_id}/runs", data={})
+    assert response.status_code == 422  # Unprocessable Entity
 
 
 @pytest.mark.asyncio
-async def test_health_endpoint():
+async def test_health_endpoint(client):
     """Test the health check endpoint."""
-    transport = ASGITransport(app=app)
-    async with AsyncClient(
-        transport=transport, base_url="http://test", timeout=10.0
-    ) as client:
-        response = await client.get("/health")
-        assert response.status_code == 200
+    response = await client.get("/health")
+    assert response.status_code == 200
 
 
 @pytest.mark.asyncio
-async def test_config_endpoint():
+async def test_config_endpoint(client):
     """Test the config endpoint."""
-    transport = ASGITransport(app=app)
-    async with AsyncClient(
-        transport=transport, base_url="http://test", timeout=10.0
-    ) as client:
-        response = await client.get("/config")
-        assert response.status_code == 200
+    response = await client.get("/config")
+    assert response.status_code == 200
 
 
-@pytest.mark.asyncio
-async def test_config_all_agents_endpoint():
-    """Test that /config/all-agents returns built-in + custom agents."""
-    transport = ASGITransport(app=app)
-    async with AsyncClient(
-        transport=transport, base_url="http://test", timeout=10.0
-    ) as client:
-        response = await client.get("/config/all-agents")
-        assert response.status_code == 200
+# =============================================================================
+# Dynamic Agent/Team Run Tests
+# =============================================================================
 
-        agents = response.json()
-        # Built-in agents should always be present
-        assert len(agents) >= 2
-        agent_ids = [a["id"] for a in agents]
-        assert "general" in agent_ids
-        assert "coding" in agent_ids
 
-        # Check structure includes builtin flag
-        for agent in agents:
-            assert "id" in agent
-            assert "name" in agent
-            assert "builtin" in agent
+@pytest.mark.asyncio
+async def test_dynamic_agent_run_builtin(client, expected_reply):
+    """Test running a built-in agent through the dynamic endpoint."""
+    # Run the built-in general agent through our dynamic endpoint
+    response = await client.post(
+        "/config/agents/general/runs",
+        data={"message": "Say hello", "stream": "false"},
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert "content" in result
+    if expected_reply is not None:
+        assert result["content"] == expected_reply
 
 
 @pytest.mark.asyncio
-async def test_config_all_teams_endpoint():
-    """Test that /config/all-teams returns built-in + custom teams."""
-    transport = ASGITransport(app=app)
-    async with AsyncClient(
-        transport=transport, base_url="http://test", timeout=10.0
-    ) as client:
-        response = await client.get("/config/all-teams")
-        assert response.status_code == 200
+async def test_dynamic_agent_runs_overlap(client, slow_llm):
+    """Test that concurrent runs overlap instead of blocking the event loop."""
 
-        teams = response.json()
-        # Built-in team should always be present
-        assert len(teams) >= 1
-        team_ids = [t["id"] for t in teams]
-        assert "research" in team_ids
+    async def run():
+        return await client.post(
+            "/config/agents/general/runs",
+            data={"message": "Say hello", "stream": "false"},
+        )
 
-        # Check structure includes builtin flag
-        for team in teams:
-            assert "id" in team
-            assert "name" in team
-            assert "builtin" in team
+    responses = await asyncio.gather(run(), run())
 
+    assert all(response.status_code == 200 for response in responses)
+    # Serialized runs would start the second model call after the first ended;
+    # comparing the calls' intervals, not total time, holds up on a busy machine
+    (first_start, first_end), (second_start, second_end) = slow_llm
+    assert second_start < first_end and first_start < second_end
 
-# =============================================================================
-# Dynamic Agent/Team Run Tests
-# =============================================================================
+
+@pytest.mark.asyncio
+async def test_run_team_batch_order_and_concurrency(app, slow_llm):
+    """Test that batched team runs keep input order and stay within max_concurrency."""
+    from agents import TEAMS, run_team_batch
+
+    session_ids = [str(uuid.uuid4()) for _ in range(4)]
+    inputs = [{"input": "Say hello", "session_id": session_id} for session_id in session_ids]
+    # Streaming can't be batched; it is overridden rather than passed twice
+    inputs[0]["stream"] = True
+
+    results = await run_team_batch(TEAMS["research"], inputs, max_concurrency=2)
+
+    assert [result.session_id for result in results] == session_ids
+    assert len(slow_llm) == len(inputs)
+    # Most model calls in flight at once: at each call's start, count the
+    # calls that started no later and hadn't ended yet
+    peak = max(
+        sum(1 for start, end in slow_llm if start <= call_start < end)
+        for call_start, _ in slow_llm
+    )
+    assert peak == 2
 
 
 @pytest.mark.asyncio
-async def test_dynamic_agent_run_builtin():
-    """Test running a built-in agent through the dynamic endpoint."""
-    transport = ASGITransport(app=app)
-    async with AsyncClient(
-        transport=transport, base_url="http://test", timeout=60.0
-    ) as client:
-        # Run the built-in general agent through our dynamic endpoint
-        response = await client.post(
-            "/config/agents/general/runs",
-            data={"message": "Say hello", "stream": "false"},
-        )
-        assert response.status_code == 200
-        result = response.json()
-        assert "content" in result
+@pytest.mark.parametrize("cumulative", ["true", "false"])
+async def test_dynamic_agent_stream_content(client, chunked_llm, cumulative):
+    """Test that streamed content events carry the text so far, or only the deltas."""
+    response = await client.post(
+        "/config/agents/general/runs",
+        data={"message": "Say hello", "stream": "true", "cumulative": cumulative},
+    )
+    assert response.status_code == 200
+    events = [orjson.loads(line) for line in response.text.splitlines()]
+
+    contents = [event["content"] for event in events if event["event"] == "RunContent"]
+    if cumulative == "true":
+        expected = ["".join(chunked_llm[: i + 1]) for i in range(len(chunked_llm))]
+    else:
+        expected = chunked_llm
+    assert contents == expected
+    # The completion event carries the full text in both modes
+    assert events[-1]["event"] == "RunCompleted"
+    assert events[-1]["content"] == "".join(chunked_llm)
 
 
 @pytest.mark.asyncio
-async def test_dynamic_agent_run_not_found():
+async def test_dynamic_agent_run_not_found(client):
     """Test that running a non-existent agent returns 404."""
-    transport = ASGITransport(app=app)
-    async with AsyncClient(
-        transport=transport, base_url="http://test", timeout=10.0
-    ) as client:
-        response = await client.post(
-            "/config/agents/nonexistent-agent/runs",
-            data={"message": "Hello", "stream": "false"},
-        )
-        assert response.status_code == 404
-        assert "not found" in response.json()["detail"].lower()
+    response = await client.post(
+        "/config/agents/nonexistent-agent/runs",
+        data={"message": "Hello", "stream": "false"},
+    )
+    assert response.status_code == 404
+    assert "not found" in response.json()["detail"].lower()
+
+
+@pytest_asyncio.fixture
+async def custom_agent_id(client):
+    """Create a custom agent through the config API and delete it afterwards."""
+    create_response = await client.post(
+        "/config/agents",
+        json={
+            # Unique per use, so the duplicate-name check never trips on a leftover
+            "name": f"Dynamic Test Agent {uuid.uuid4().hex[:8]}",
+            "description": "Agent for testing dynamic loading",
+            "model_id": "mistralai/devstral-2512:free",
+            "instructions": "You are a test agent. Just say 'Hello from dynamic agent!'",
+        },
+    )
+    assert create_response.status_code == 201
+    agent_id = create_response.json()["id"]
+
+    yield agent_id
+
+    # Clean up - delete the test agent
+    await client.delete(f"/config/agents/{agent_id}")
 
 
 @pytest.mark.asyncio
-async def test_dynamic_agent_create_and_run():
-    """Test creating a custom agent and running it without restart."""
-    transport = ASGITransport(app=app)
-    async with AsyncClient(
-        transport=transport, base_url="http://test", timeout=60.0
-    ) as client:
-        # Create a custom agent
-        create_response = await client.post(
-            "/config/agents",
-            json={
-                "name": "Dynamic Test Agent",
-                "description": "Agent for testing dynamic loading",
-                "model_id": "mistralai/devstral-2512:free",
-                "instructions": "You are a test agent. Just say 'Hello from dynamic agent!'",
-            },
-        )
-        assert create_response.status_code == 201
-        agent_data = create_response.json()
-        agent_id = agent_data["id"]
-
-        try:
-            # Verify it appears in the list
-            list_response = await client.get("/config/all-agents")
-            agents = list_response.json()
-            agent_ids = [a["id"] for a in agents]
-            assert agent_id in agent_ids
-
-            # Run the custom agent through the dynamic endpoint
-            run_response = await client.post(
-                f"/config/agents/{agent_id}/runs",
-                data={"message": "Say hello", "stream": "false"},
-            )
-            assert run_response.status_code == 200
-            result = run_response.json()
-            assert "content" in result
-
-        finally:
-            # Clean up - delete the test agent
-            await client.delete(f"/config/agents/{agent_id}")
+async def test_dynamic_agent_create_lists_without_restart(client, custom_agent_id):
+    """Test that a newly created custom agent is listed without restart."""
+    list_response = await client.get("/config/all-agents")
+    agents = list_response.json()
+    agent_ids = [a["id"] for a in agents]
+    assert custom_agent_id in agent_ids
+
+
+@pytest.mark.asyncio
+async def test_dynamic_agent_run_after_create(client, custom_agent_id, expected_reply):
+    """Test running a newly created custom agent through the dynamic endpoint."""
+    run_response = await client.post(
+        f"/config/agents/{custom_agent_id}/runs",
+        data={"message": "Say hello", "stream": "false"},
+    )
+    assert run_response.status_code == 200
+    result = run_response.json()
+    assert "content" in result
+    if expected_reply is not None:
+        assert result["content"] == expected_reply
 
 
 @pytest.mark.asyncio
-@pytest.mark.skip(reason="Team runs take long and have async cleanup issues in test env")
-async def test_dynamic_team_run_builtin():
+async def test_dynamic_team_run_builtin(client, llm, expected_reply):
     """Test running a built-in team through the dynamic endpoint."""
-    transport = ASGITransport(app=app)
-    async with AsyncClient(
-        transport=transport, base_url="http://test", timeout=120.0
-    ) as client:
-        # Run the built-in research team through our dynamic endpoint
-        response = await client.post(
-            "/config/teams/research/runs",
-            data={"message": "Say hello as a team", "stream": "false"},
-        )
-        assert response.status_code == 200
-        result = response.json()
-        assert "content" in result
+    if llm == "real":
+        pytest.skip("Team runs take long and have async cleanup issues in test env")
+    # Run the built-in research team through our dynamic endpoint
+    response = await client.post(
+        "/config/teams/research/runs",
+        data={"message": "Say hello as a team", "stream": "false"},
+        timeout=120.0,
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert "content" in result
+    if expected_reply is not None:
+        assert result["content"] == expected_reply
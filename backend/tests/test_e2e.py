@@ -4,17 +4,61 @@ import os
 import re
 
 import pytest
-from playwright.sync_api import Page, expect
+from playwright.sync_api import Browser, Locator, Page, Response, expect
 
 FRONTEND_URL = os.environ.get("FRONTEND_URL", "http://localhost:3001")
 
 
 @pytest.fixture(scope="session")
 def browser_context_args():
-    """Configure browser context."""
+    """Configure browser context.
+
+    The tests are spread across xdist workers; pytest-playwright's browser
+    fixture is session-scoped, so each worker launches its browser once.
+    """
     return {"base_url": FRONTEND_URL}
 
 
+# Upper bound for an agent run; the tests wait on the run's response itself
+RUN_TIMEOUT_MS = 60000
+
+
+def _is_run_request(response: Response) -> bool:
+    """Whether a response belongs to a POST that starts an agent or team run."""
+    return response.request.method == "POST" and response.url.endswith("/runs")
+
+
+def send_and_wait_for_run(page: Page, send_button: Locator) -> None:
+    """Click send and return once the run's streamed response has finished."""
+    with page.expect_response(_is_run_request, timeout=RUN_TIMEOUT_MS) as response_info:
+        send_button.click()
+    response = response_info.value
+    assert response.ok
+    assert response.finished() is None
+
+
+@pytest.fixture(scope="class")
+def loaded_page(browser: Browser, browser_context_args):
+    """A page with the chat UI loaded once and shared by a test class."""
+    context = browser.new_context(**browser_context_args)
+    page = context.new_page()
+    page.goto("/")
+    yield page
+    context.close()
+
+
+@pytest.fixture
+def chat_page(loaded_page: Page) -> Page:
+    """The class's shared page, reset to an empty chat instead of reloaded."""
+    stop_button = loaded_page.get_by_role("button", name="Stop")
+    if stop_button.is_visible():
+        stop_button.click()
+        expect(loaded_page.get_by_role("button", name="Send")).to_be_visible()
+    loaded_page.get_by_placeholder("Type a message...").fill("")
+    loaded_page.get_by_role("button", name="Clear chat").click()
+    return loaded_page
+
+
 class TestChatInterface:
     """Tests for the basic chat interface."""
 
@@ -37,29 +81,25 @@ class TestChatInterface:
         # Check empty state message
         expect(page.get_by_text("Start a conversation with the agent")).to_be_visible()
 
-    def test_shows_user_message_immediately(self, page: Page):
+    def test_shows_user_message_immediately(self, chat_page: Page):
         """Should show user message immediately after sending."""
-        page.goto("/")
-
-        input_field = page.get_by_placeholder("Type a message...")
-        send_button = page.get_by_role("button", name="Send")
+        input_field = chat_page.get_by_placeholder("Type a message...")
+        send_button = chat_page.get_by_role("button", name="Send")
 
         # Type a message
         input_field.fill("Hello agent!")
         send_button.click()
 
         # User message should appear immediately
-        expect(page.get_by_text("Hello agent!")).to_be_visible()
+        expect(chat_page.get_by_text("Hello agent!")).to_be_visible()
 
         # Empty state should be gone
-        expect(page.get_by_text("Start a conversation with the agent")).not_to_be_visible()
+        expect(chat_page.get_by_text("Start a conversation with the agent")).not_to_be_visible()
 
-    def test_disables_input_while_loading(self, page: Page):
+    def test_disables_input_while_loading(self, chat_page: Page):
         """Should disable input while loading."""
-        page.goto("/")
-
-        input_field = page.get_by_placeholder("Type a message...")
-        send_button = page.get_by_role("button", name="Send")
+        input_field = chat_page.get_by_placeholder("Type a message...")
+        send_button = chat_page.get_by_role("button", name="Send")
 
         # Type and send a message
         input_field.fill("Test message")
@@ -69,44 +109,38 @@ class TestChatInterface:
         expect(input_field).to_be_disabled()
 
         # Stop button should appear (replaces Send)
-        expect(page.get_by_role("button", name="Stop")).to_be_visible()
+        expect(chat_page.get_by_role("button", name="Stop")).to_be_visible()
 
-    def test_receives_assistant_response(self, page: Page):
+    def test_receives_assistant_response(self, chat_page: Page):
         """Should receive and display assistant response."""
-        page.goto("/")
+        input_field = chat_page.get_by_placeholder("Type a message...")
+        send_button = chat_page.get_by_role("button", name="Send")
 
-        input_field = page.get_by_placeholder("Type a message...")
-        send_button = page.get_by_role("button", name="Send")
-
-        # Send a simple message
+        # Send a simple message and wait for the run's stream to complete
         input_field.fill("Say hello")
-        send_button.click()
+        send_and_wait_for_run(chat_page, send_button)
 
-        # Wait for response to complete (Send button reappears)
-        expect(page.get_by_role("button", name="Send")).to_be_visible(timeout=60000)
+        # Send button reappears once the UI has processed the finished run
+        expect(chat_page.get_by_role("button", name="Send")).to_be_visible()
 
         # Should have at least 2 message bubbles (user + assistant)
-        messages = page.locator('[class*="max-w-[85%]"]')
+        messages = chat_page.locator('[class*="max-w-[85%]"]')
         expect(messages).to_have_count(2, timeout=5000)
 
-    def test_sends_message_with_enter_key(self, page: Page):
+    def test_sends_message_with_enter_key(self, chat_page: Page):
         """Should allow sending messages with Enter key."""
-        page.goto("/")
-
-        input_field = page.get_by_placeholder("Type a message...")
+        input_field = chat_page.get_by_placeholder("Type a message...")
 
         # Type a message and press Enter
         input_field.fill("Test enter key")
         input_field.press("Enter")
 
         # User message should appear
-        expect(page.get_by_text("Test enter key")).to_be_visible()
+        expect(chat_page.get_by_text("Test enter key")).to_be_visible()
 
-    def test_shift_enter_creates_newline(self, page: Page):
+    def test_shift_enter_creates_newline(self, chat_page: Page):
         """Should support Shift+Enter for new lines."""
-        page.goto("/")
-
-        input_field = page.get_by_placeholder("Type a message...")
+        input_field = chat_page.get_by_placeholder("Type a message...")
 
         # Type with Shift+Enter (should not send)
         input_field.fill("Line 1")
@@ -116,43 +150,39 @@ class TestChatInterface:
         # Message should not be sent, input should contain both lines
         expect(input_field).to_have_value("Line 1\nLine 2")
 
-    def test_clears_messages_with_clear_button(self, page: Page):
+    def test_clears_messages_with_clear_button(self, chat_page: Page):
         """Should clear messages with Clear chat button."""
-        page.goto("/")
-
-        input_field = page.get_by_placeholder("Type a message...")
-        send_button = page.get_by_role("button", name="Send")
-        clear_button = page.get_by_role("button", name="Clear chat")
+        input_field = chat_page.get_by_placeholder("Type a message...")
+        send_button = chat_page.get_by_role("button", name="Send")
+        clear_button = chat_page.get_by_role("button", name="Clear chat")
 
         # Send a message first
         input_field.fill("Test message to clear")
         send_button.click()
 
         # Wait for message to appear
-        expect(page.get_by_text("Test message to clear")).to_be_visible()
+        expect(chat_page.get_by_text("Test message to clear")).to_be_visible()
 
         # Clear the chat
         clear_button.click()
 
         # Message should be gone
-        expect(page.get_by_text("Test message to clear")).not_to_be_visible()
+        expect(chat_page.get_by_text("Test message to clear")).not_to_be_visible()
 
         # Empty state should return
-        expect(page.get_by_text("Start a conversation with the agent")).to_be_visible()
+        expect(chat_page.get_by_text("Start a conversation with the agent")).to_be_visible()
 
-    def test_stops_generation(self, page: Page):
+    def test_stops_generation(self, chat_page: Page):
         """Should stop generation when Stop button is clicked."""
-        page.goto("/")
-
-        input_field = page.get_by_placeholder("Type a message...")
-        send_button = page.get_by_role("button", name="Send")
+        input_field = chat_page.get_by_placeholder("Type a message...")
+        send_button = chat_page.get_by_role("button", name="Send")
 
         # Send a message that might trigger a longer response
         input_field.fill("Write a long explanation")
         send_button.click()
 
         # Wait for Stop button to appear
-        stop_button = page.get_by_role("button", name="Stop")
+        stop_button = chat_page.get_by_role("button", name="Stop")
         expect(stop_button).to_be_visible(timeout=5000)
 
         # Click stop
@@ -177,10 +207,10 @@ class TestToolCallDisplay:
 
         # Send a message that should trigger a tool call
         input_field.fill("Run this Python code: print('test')")
-        send_button.click()
+        send_and_wait_for_run(page, send_button)
 
-        # Wait for response to complete
-        expect(page.get_by_role("button", name="Send")).to_be_visible(timeout=60000)
+        # Send button reappears once the UI has processed the finished run
+        expect(page.get_by_role("button", name="Send")).to_be_visible()
 
         # Look for tool call card (should show run_python_code or similar)
         # Tool calls show the tool name in a monospace font